@@ -0,0 +1,138 @@
+"""
+Benchmark: the seven analytics views called separately (each one
+aggregating, or memoized through one dataset_fingerprint) vs one fused
+analyze_sales pass
+
+Run from the project root:
+    python -m benchmarks.bench_aggregation [rows]
+"""
+
+import sys
+import time
+
+from benchmarks.synthetic_data import iter_sales_rows
+from utils import data_processor
+from utils.file_handler import parse_transactions
+from utils.data_processor import (
+    clear_aggregate_cache,
+    dataset_fingerprint,
+    analyze_sales,
+    calculate_total_revenue,
+    region_wise_sales,
+    top_selling_products,
+    customer_analysis,
+    daily_sales_trend,
+    find_peak_sales_day,
+    low_performing_products
+)
+
+class CountingList(list):
+    """
+    List that counts how many times it has been iterated (any scan,
+    including the memo's fingerprint pass)
+    """
+
+    passes = 0
+
+    def __iter__(self):
+        self.passes += 1
+        return super().__iter__()
+
+def make_transactions(rows, seed=42):
+    """
+    Parses rows synthetic sales lines (see benchmarks.synthetic_data)
+    into an in-memory list
+
+    Returns: CountingList of transaction dictionaries
+    """
+
+    return CountingList(parse_transactions(list(iter_sales_rows(rows, seed=seed))))
+
+VIEWS = (
+    calculate_total_revenue,
+    region_wise_sales,
+    top_selling_products,
+    customer_analysis,
+    daily_sales_trend,
+    find_peak_sales_day,
+    low_performing_products
+)
+
+def run_separate(transactions):
+    """
+    Calls each view on its own, so each one aggregates the dataset
+
+    Parameters: transactions (list of dictionaries)
+    """
+
+    for view in VIEWS:
+        view(transactions)
+
+def run_memoized(transactions):
+    """
+    Calls each view with one shared fingerprint, so they reuse one memoized
+    aggregation
+
+    Parameters: transactions (list of dictionaries)
+    """
+
+    fingerprint = dataset_fingerprint(transactions)
+    for view in VIEWS:
+        view(transactions, fingerprint=fingerprint)
+
+def run_fused(transactions):
+    """
+    Computes every view from one analyze_sales pass
+
+    Parameters: transactions (list of dictionaries)
+    """
+
+    analyze_sales(transactions)
+
+def count_aggregations(func, transactions):
+    """
+    Runs func(transactions), counting aggregate_transactions calls (one
+    full aggregation pass each; memo hits and fingerprints are not counted)
+
+    Returns: number of aggregation passes
+    """
+
+    aggregate = data_processor.aggregate_transactions
+    calls = 0
+
+    def counting_aggregate(*args, **kwargs):
+        nonlocal calls
+        calls += 1
+        return aggregate(*args, **kwargs)
+
+    data_processor.aggregate_transactions = counting_aggregate
+    try:
+        func(transactions)
+    finally:
+        data_processor.aggregate_transactions = aggregate
+
+    return calls
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    transactions = make_transactions(rows)
+
+    print(f"Rows: {rows:,}")
+    print(f"{'Mode':<10}{'Aggregations':>14}{'Scans':>8}{'Seconds':>12}")
+
+    modes = (
+        ("separate", run_separate),
+        ("memoized", run_memoized),
+        ("fused", run_fused)
+    )
+    for name, func in modes:
+        # Each mode starts cold, so neither one reuses the other's memo entry
+        clear_aggregate_cache()
+        transactions.passes = 0
+        start = time.perf_counter()
+        aggregations = count_aggregations(func, transactions)
+        elapsed = time.perf_counter() - start
+        print(f"{name:<10}{aggregations:>14}{transactions.passes:>8}{elapsed:>12.3f}")
+
+if __name__ == "__main__":
+    main()
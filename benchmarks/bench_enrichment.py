@@ -0,0 +1,73 @@
+"""
+Benchmark: per-row ProductID parsing vs the ProductID-keyed product index
+
+Run from the project root:
+    python -m benchmarks.bench_enrichment [rows]
+"""
+
+import sys
+import time
+
+from utils.api_handler import create_product_mapping, enrich_sales_data
+from benchmarks.bench_aggregation import make_transactions
+
+def legacy_enrich(transactions, product_mapping):
+    """
+    Previous enrichment loop: copy, digit filter and int() on every row
+
+    Parameters: transactions (list of dictionaries), product_mapping (dictionary)
+    Returns: list of enriched transaction dictionaries
+    """
+
+    enriched_transactions = []
+    for t in transactions:
+        enriched = t.copy()
+        try:
+            numeric_id = int("".join(filter(str.isdigit, t.get("ProductID", ""))))
+            api_info = product_mapping.get(numeric_id)
+            if api_info:
+                enriched["API_Category"] = api_info.get("category")
+                enriched["API_Brand"] = api_info.get("brand")
+                enriched["API_Rating"] = api_info.get("rating")
+                enriched["API_Match"] = True
+            else:
+                enriched["API_Category"] = None
+                enriched["API_Brand"] = None
+                enriched["API_Rating"] = None
+                enriched["API_Match"] = False
+        except Exception:
+            enriched["API_Category"] = None
+            enriched["API_Brand"] = None
+            enriched["API_Rating"] = None
+            enriched["API_Match"] = False
+        enriched_transactions.append(enriched)
+    return enriched_transactions
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    transactions = list(make_transactions(rows))
+
+    api_products = [
+        {"id": i, "title": f"Item {i}", "category": "misc", "brand": "Brand", "rating": 4.5}
+        for i in range(1, 195)
+    ]
+
+    print(f"Rows: {rows:,}")
+
+    start = time.perf_counter()
+    product_mapping = create_product_mapping(api_products)
+    legacy = legacy_enrich(transactions, product_mapping)
+    print(f"{'legacy (per-row parse)':<28}{time.perf_counter() - start:>8.3f}s")
+
+    start = time.perf_counter()
+    product_index = create_product_mapping(
+        api_products,
+        product_ids=(t["ProductID"] for t in transactions)
+    )
+    indexed = enrich_sales_data(transactions, product_index)
+    print(f"{'indexed (one dict hit)':<28}{time.perf_counter() - start:>8.3f}s")
+
+    assert legacy == indexed
+
+if __name__ == "__main__":
+    main()
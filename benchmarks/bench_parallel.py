@@ -0,0 +1,38 @@
+"""
+Benchmark: parallel_analyze scaling with the number of worker processes
+
+Run from the project root:
+    python -m benchmarks.bench_parallel [rows] [max_workers]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.synthetic_data import generate_sales_file
+from utils.parallel import parallel_analyze
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    max_workers = int(sys.argv[2]) if len(sys.argv) > 2 else (os.cpu_count() or 1)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "sales_data.txt")
+        generate_sales_file(path, rows)
+
+        print(f"Rows: {rows:,}  CPUs: {os.cpu_count()}")
+        print(f"{'Workers':<10}{'Seconds':>10}{'Speedup':>10}")
+
+        baseline = None
+        workers = 1
+        while workers <= max_workers:
+            start = time.perf_counter()
+            parallel_analyze(path, workers=workers)
+            elapsed = time.perf_counter() - start
+            baseline = baseline or elapsed
+            print(f"{workers:<10}{elapsed:>10.3f}{baseline / elapsed:>9.2f}x")
+            workers *= 2
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Benchmark: previous per-line parser vs the current per-line parser
+(dicts, tuples, and tuples fed to TransactionTable.extend_rows)
+
+The gain is small. At 300k lines parse_transactions is about 1.05-1.1x
+faster than the previous parser, iter_transaction_rows about 1.3x.
+Run-to-run noise on a shared machine is of the same order, so compare
+several runs.
+
+Uses the sample data (data/sales_data.txt) repeated to the requested
+number of lines, plus a set of malformed lines that must be rejected or
+cleaned exactly as before.
+
+Run from the project root:
+    python -m benchmarks.bench_parser [lines]
+"""
+
+import gc
+import sys
+import time
+
+from utils.file_handler import read_sales_data, parse_transactions, iter_transaction_rows
+from utils.transaction_table import TransactionTable
+
+EDGE_CASE_LINES = [
+    "T900|2024-12-01|P101|Laptop|2|45000|C001|North",
+    " T901 | 2024-12-01 | P102 | Mouse, Wireless | 1,200 | 1,499.50 | C002 | South ",
+    "T902|2024-12-01|P103|Keyboard|abc|500|C003|East",
+    "T903|2024-12-01|P104|Monitor|2|12,000.00.5|C004|West",
+    "T904|2024-12-01|P105|Webcam|3|2500|C005",
+    "T905|2024-12-01|P106|Headphones|3|2500|C006|North|extra",
+    "T906|2024-12-01|P107|USB Cable|1_000|1e3|C007|South",
+    "T907|2024-12-01|P108|Charger|\x1c4\x1c|nan|C008|East",
+    "T908|2024-12-01|P109|Mouse|-3|-10|C009|West",
+    "T909|2024-12-01|P110|Pen||10|C010|North",
+    "T910|2024-12-01|P111|Desk|99999999999999999999|10|C011|North",
+    "",
+    "||||||||",
+]
+
+def legacy_parse(raw_lines):
+    """
+    Previous parse_transactions: one split/strip/replace/dict per line
+
+    Parameters: raw_lines (list of strings)
+    Returns: list of transaction dictionaries
+    """
+
+    transactions = []
+    for line in raw_lines:
+        parts = line.split("|")
+        if len(parts) != 8:
+            continue
+        try:
+            transactions.append({
+                "TransactionID": parts[0].strip(),
+                "Date": parts[1].strip(),
+                "ProductID": parts[2].strip(),
+                "ProductName": parts[3].replace(",", "").strip(),
+                "Quantity": int(parts[4].replace(",", "").strip()),
+                "UnitPrice": float(parts[5].replace(",", "").strip()),
+                "CustomerID": parts[6].strip(),
+                "Region": parts[7].strip()
+            })
+        except (ValueError, IndexError):
+            continue
+    return transactions
+
+def same_records(left, right):
+    """
+    Compares two parsed lists, treating NaN unit prices as equal
+
+    Parameters: left, right (lists of transaction dictionaries)
+    Returns: True if every record matches
+    """
+
+    def key(t):
+        return {k: ("nan" if v != v else v) for k, v in t.items()}
+
+    return len(left) == len(right) and all(key(a) == key(b) for a, b in zip(left, right))
+
+def timed(label, func, *args, repeat=7, baseline=None):
+    """
+    Prints the best of several calls, and its speedup over baseline
+    seconds when given; results are dropped so earlier runs' objects do
+    not slow later ones down through garbage collection
+
+    Parameters: label (string), func and its args, repeat (calls to time),
+                baseline (seconds, or None)
+    Returns: best time in seconds
+    """
+
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    speedup = f"{baseline / best:>8.2f}x" if baseline else ""
+    print(f"{label:<32}{best:>8.3f}s{speedup}")
+    return best
+
+def main():
+    target = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+
+    sample = read_sales_data("data/sales_data.txt")
+    lines = (sample * (target // len(sample) + 1))[:target]
+
+    # ---------- Same acceptance/rejection as before ----------
+    for case in (EDGE_CASE_LINES, sample + EDGE_CASE_LINES, EDGE_CASE_LINES + sample):
+        assert same_records(legacy_parse(case), parse_transactions(case))
+    table = parse_transactions(sample + EDGE_CASE_LINES, columnar=True)
+    expected = [t for t in legacy_parse(sample + EDGE_CASE_LINES) if t["Quantity"] < 2 ** 63]
+    assert same_records(list(table), expected)
+
+    print(f"Lines: {len(lines):,}")
+
+    legacy = timed("legacy (dict per line)", legacy_parse, lines)
+    timed("parse_transactions", parse_transactions, lines, baseline=legacy)
+    timed("iter_transaction_rows (tuples)", lambda: list(iter_transaction_rows(lines)),
+          baseline=legacy)
+    table_legacy = timed("legacy -> TransactionTable",
+                         lambda: TransactionTable.from_records(legacy_parse(lines)))
+    timed("parse_transactions(columnar)", parse_transactions, lines, True,
+          baseline=table_legacy)
+
+if __name__ == "__main__":
+    main()
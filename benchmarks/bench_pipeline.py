@@ -0,0 +1,279 @@
+"""
+Benchmark: every pipeline stage on synthetic files of increasing size
+
+For each size a synthetic sales file is generated (see
+benchmarks.synthetic_data) and these stages are timed, best of
+--repeat runs:
+    read_sales_data, parse_transactions, validate_and_filter (no filter
+    and region filter), each data_processor view, analyze_sales,
+    enrichment (create_product_mapping + enrich_sales_data) and
+    generate_sales_report
+
+The aggregate memo is cleared before every analytics call, so each view
+is timed doing its own aggregation. Enrichment uses a synthetic product
+catalog; nothing is fetched from the network.
+
+Results are saved as JSON (default benchmarks/results/pipeline_<commit>.json)
+so runs from different commits can be compared with --compare.
+
+Run from the project root:
+    python -m benchmarks.bench_pipeline [--sizes 10000 100000 1000000]
+        [--dirty-ratio 0.05] [--repeat 3] [--compare OLD.json]
+
+10^7 rows needs several GB of memory (one dict per transaction).
+"""
+
+import argparse
+import contextlib
+import gc
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+from benchmarks.synthetic_data import generate_sales_file
+from utils.file_handler import read_sales_data, parse_transactions, validate_and_filter
+from utils.data_processor import (
+    clear_aggregate_cache,
+    calculate_total_revenue,
+    region_wise_sales,
+    top_selling_products,
+    customer_analysis,
+    daily_sales_trend,
+    find_peak_sales_day,
+    low_performing_products,
+    analyze_sales
+)
+from utils.api_handler import create_product_mapping, enrich_sales_data
+from utils.pipeline_stats import peak_rss_bytes
+from output.sales_report import generate_sales_report
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+RESULTS_DIR = os.path.join("benchmarks", "results")
+
+ANALYTICS_VIEWS = [
+    calculate_total_revenue,
+    region_wise_sales,
+    top_selling_products,
+    customer_analysis,
+    daily_sales_trend,
+    find_peak_sales_day,
+    low_performing_products,
+    analyze_sales
+]
+
+def git_revision():
+    """
+    Returns: short commit hash (+ '-dirty' for uncommitted changes), or None
+    """
+
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+        dirty = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+    return f"{commit}-dirty" if dirty else commit
+
+def synthetic_catalog(products):
+    """
+    Builds a catalog covering every synthetic ProductID
+
+    Parameters: products (number of product IDs)
+    Returns: API-style product list
+    """
+
+    return [
+        {"id": 101 + i, "title": f"Item {i}", "category": "misc", "brand": "Brand", "rating": 4.5}
+        for i in range(products)
+    ]
+
+def measure(func, repeat):
+    """
+    Calls func() repeat times with its output suppressed
+
+    Returns: (best seconds, result of the last call)
+    """
+
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        # Drop the previous result first so its garbage does not slow
+        # the next run down
+        result = None
+        gc.collect()
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            result = func()
+            elapsed = time.perf_counter() - start
+        best = min(best, elapsed)
+    return best, result
+
+def bench_file(path, repeat, report_file):
+    """
+    Times every stage on one sales file
+
+    Returns: list of {'stage', 'seconds', 'rows', 'rows_per_sec'}
+    """
+
+    stages = []
+
+    def record(stage, seconds, rows):
+        stages.append({
+            "stage": stage,
+            "seconds": seconds,
+            "rows": rows,
+            "rows_per_sec": rows / seconds if seconds > 0 else None
+        })
+        print(f"  {stage:<30}{seconds:>10.4f}s{rows / seconds if seconds > 0 else 0:>14,.0f} rows/s")
+
+    seconds, raw_lines = measure(lambda: read_sales_data(path), repeat)
+    record("read_sales_data", seconds, len(raw_lines))
+
+    seconds, transactions = measure(lambda: parse_transactions(raw_lines), repeat)
+    record("parse_transactions", seconds, len(raw_lines))
+
+    seconds, (valid, _, _) = measure(lambda: validate_and_filter(transactions), repeat)
+    record("validate_and_filter", seconds, len(transactions))
+
+    seconds, _ = measure(lambda: validate_and_filter(transactions, region="North"), repeat)
+    record("validate_and_filter(region)", seconds, len(transactions))
+
+    raw_lines = None
+
+    for view in ANALYTICS_VIEWS:
+        def run_view(view=view):
+            clear_aggregate_cache()
+            return view(valid)
+        seconds, analytics = measure(run_view, repeat)
+        record(view.__name__, seconds, len(valid))
+
+    products = len({t["ProductID"] for t in valid})
+    api_products = synthetic_catalog(products)
+
+    def enrich():
+        product_map = create_product_mapping(api_products, product_ids=(t["ProductID"] for t in valid))
+        return enrich_sales_data(valid, product_map)
+
+    seconds, enriched = measure(enrich, repeat)
+    record("enrichment", seconds, len(valid))
+
+    # analytics is analyze_sales' result (the last view), as in main.py
+    seconds, _ = measure(
+        lambda: generate_sales_report(valid, enriched, report_file, analytics=analytics),
+        repeat
+    )
+    record("generate_sales_report", seconds, len(valid))
+
+    return stages
+
+def compare(previous, current):
+    """
+    Prints per-stage seconds of two result files side by side
+
+    Parameters: previous, current (result dictionaries)
+    """
+
+    print(f"\nComparison: {previous.get('label')} -> {current.get('label')}")
+    old = {
+        (size["rows"], stage["stage"]): stage["seconds"]
+        for size in previous["results"] for stage in size["stages"]
+    }
+
+    for size in current["results"]:
+        print(f"Rows: {size['rows']:,}")
+        for stage in size["stages"]:
+            before = old.get((size["rows"], stage["stage"]))
+            if before is None:
+                print(f"  {stage['stage']:<30}{'-':>10} {stage['seconds']:>10.4f}s")
+                continue
+            print(f"  {stage['stage']:<30}{before:>10.4f}s {stage['seconds']:>10.4f}s"
+                  f"{before / stage['seconds'] if stage['seconds'] else 0:>8.2f}x")
+
+def main():
+    parser = argparse.ArgumentParser(description="Time every pipeline stage on synthetic data")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES,
+                        help="row counts to benchmark (default: 10^4 10^5 10^6)")
+    parser.add_argument("--products", type=int, default=50)
+    parser.add_argument("--customers", type=int, help="default: rows // 10")
+    parser.add_argument("--regions", type=int, default=4)
+    parser.add_argument("--dirty-ratio", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--data-dir",
+                        help="keep generated files here and reuse them on later runs "
+                             "(default: a temporary directory)")
+    parser.add_argument("--output", help="results file (default: benchmarks/results/pipeline_<commit>.json)")
+    parser.add_argument("--label", help="name for this run (default: git commit)")
+    parser.add_argument("--compare", help="previous results file to compare against")
+    args = parser.parse_args()
+
+    label = args.label or git_revision() or "local"
+    output = args.output or os.path.join(RESULTS_DIR, f"pipeline_{label}.json")
+
+    results = {
+        "label": label,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "params": {
+            "products": args.products,
+            "customers": args.customers,
+            "regions": args.regions,
+            "dirty_ratio": args.dirty_ratio,
+            "seed": args.seed,
+            "repeat": args.repeat
+        },
+        "results": []
+    }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = args.data_dir or tmp
+        report_file = os.path.join(tmp, "sales_report.txt")
+
+        for rows in args.sizes:
+            path = os.path.join(
+                data_dir,
+                f"sales_{rows}_p{args.products}_c{args.customers or 'auto'}_r{args.regions}"
+                f"_d{args.dirty_ratio}_s{args.seed}.txt"
+            )
+            if os.path.exists(path):
+                data = {"path": path, "rows": rows, "bytes": os.path.getsize(path), "dirty_counts": None}
+            else:
+                data = generate_sales_file(path, rows, args.products, args.customers,
+                                           args.regions, args.dirty_ratio, args.seed)
+
+            print(f"Rows: {rows:,} ({data['bytes']:,} bytes)")
+            stages = bench_file(path, args.repeat, report_file)
+            results["results"].append({
+                "rows": rows,
+                "file_bytes": data["bytes"],
+                "dirty_counts": data["dirty_counts"],
+                "stages": stages,
+                "peak_rss_bytes": peak_rss_bytes()
+            })
+            gc.collect()
+
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults saved to '{output}'")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            compare(json.load(f), results)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""
+Synthetic sales-data generator for the benchmarks
+
+Writes files in the exact data/sales_data.txt format (header line, then
+pipe-delimited TransactionID|Date|ProductID|ProductName|Quantity|
+UnitPrice|CustomerID|Region rows) with configurable size, cardinalities
+and a share of dirty rows of the kinds found in the sample file. The
+same arguments and seed always produce the same file.
+
+Run from the project root:
+    python -m benchmarks.synthetic_data OUTPUT [--rows N] [--products N]
+        [--customers N] [--regions N] [--dirty-ratio R] [--seed N]
+"""
+
+import argparse
+import os
+import random
+from datetime import date, timedelta
+
+HEADER = "TransactionID|Date|ProductID|ProductName|Quantity|UnitPrice|CustomerID|Region"
+BASE_REGIONS = ["North", "South", "East", "West"]
+BASE_PRODUCTS = [
+    "Laptop", "Wireless Mouse", "USB Cable", "Keyboard", "Monitor",
+    "Headphones", "Webcam", "External Hard Drive", "Laptop Charger", "Mouse Pad"
+]
+
+# Dirty row kinds: the first two are still valid once parsed (commas
+# are stripped), the rest are rejected by parsing or validation
+DIRTY_KINDS = [
+    "comma_in_number",
+    "comma_in_name",
+    "invalid_transaction_id",
+    "invalid_product_id",
+    "invalid_customer_id",
+    "non_positive_quantity",
+    "missing_region",
+    "non_numeric_quantity",
+    "wrong_field_count"
+]
+
+WRITE_BATCH_SIZE = 10_000
+
+def region_names(count):
+    """
+    Returns: list of count region names, starting with North/South/East/West
+    """
+
+    return (BASE_REGIONS + [f"Region{i}" for i in range(len(BASE_REGIONS) + 1, count + 1)])[:count]
+
+def product_catalog(count):
+    """
+    Returns: list of (ProductID, ProductName) pairs, IDs P101, P102, ...
+    """
+
+    catalog = []
+    for i in range(count):
+        name = BASE_PRODUCTS[i % len(BASE_PRODUCTS)]
+        if i >= len(BASE_PRODUCTS):
+            name = f"{name} {i // len(BASE_PRODUCTS) + 1}"
+        catalog.append((f"P{101 + i}", name))
+    return catalog
+
+def iter_sales_rows(rows, products=50, customers=None, regions=4, dirty_ratio=0.0,
+                    seed=42, start_date=date(2024, 1, 1), days=365, dirty_counts=None):
+    """
+    Yields: rows lines (without newline) in the sales-file format
+
+    Parameters:
+    - products / customers / regions: number of distinct ProductIDs,
+      CustomerIDs (default rows // 10) and Regions
+    - dirty_ratio: share of rows (0-1) turned into one of DIRTY_KINDS
+    - dirty_counts: optional dict, updated with the number of rows
+      generated per dirty kind
+    """
+
+    rng = random.Random(seed)
+    customers = customers or max(1, rows // 10)
+    catalog = product_catalog(products)
+    region_list = region_names(regions)
+    dates = [(start_date + timedelta(days=d)).isoformat() for d in range(days)]
+    # Typical unit price per product, so revenue ranking is stable
+    base_prices = [rng.randint(100, 90000) for _ in catalog]
+
+    randrange = rng.randrange
+    randint = rng.randint
+    random_float = rng.random
+
+    for i in range(rows):
+        product = randrange(products)
+        product_id, product_name = catalog[product]
+        fields = [
+            f"T{i + 1:07d}",
+            dates[randrange(days)],
+            product_id,
+            product_name,
+            str(randint(1, 10)),
+            str(base_prices[product] + randrange(100)),
+            f"C{randrange(customers) + 1:06d}",
+            region_list[randrange(regions)]
+        ]
+
+        if dirty_ratio and random_float() < dirty_ratio:
+            kind = DIRTY_KINDS[randrange(len(DIRTY_KINDS))]
+            _make_dirty(fields, kind, rng)
+            if dirty_counts is not None:
+                dirty_counts[kind] = dirty_counts.get(kind, 0) + 1
+
+        yield "|".join(fields)
+
+def _make_dirty(fields, kind, rng):
+    """
+    Rewrites fields in place into a row of the given dirty kind
+    """
+
+    if kind == "comma_in_number":
+        fields[4] = f"{int(fields[4]) * 100:,}"
+        fields[5] = f"{int(fields[5]) + 1000:,}"
+    elif kind == "comma_in_name":
+        fields[3] = fields[3].replace(" ", ", ", 1) if " " in fields[3] else fields[3] + ", Pro"
+    elif kind == "invalid_transaction_id":
+        fields[0] = "X" + fields[0][1:]
+    elif kind == "invalid_product_id":
+        fields[2] = "Q" + fields[2][1:]
+    elif kind == "invalid_customer_id":
+        fields[6] = "U" + fields[6][1:]
+    elif kind == "non_positive_quantity":
+        fields[4] = str(-rng.randint(0, 5))
+    elif kind == "missing_region":
+        fields[7] = ""
+    elif kind == "non_numeric_quantity":
+        fields[4] = "abc"
+    elif kind == "wrong_field_count":
+        del fields[rng.randrange(len(fields))]
+
+def generate_sales_file(path, rows, products=50, customers=None, regions=4,
+                        dirty_ratio=0.0, seed=42):
+    """
+    Writes a synthetic sales file (header + rows lines)
+
+    Returns: dictionary:
+    {
+        'path': str,
+        'rows': int,
+        'bytes': int,
+        'dirty_counts': {kind: count}
+    }
+    """
+
+    dirty_counts = {}
+    lines = iter_sales_rows(rows, products, customers, regions, dirty_ratio, seed,
+                            dirty_counts=dirty_counts)
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(HEADER + "\n")
+        while True:
+            batch = list(zip(range(WRITE_BATCH_SIZE), lines))
+            if not batch:
+                break
+            f.write("\n".join(line for _, line in batch) + "\n")
+
+    return {
+        "path": path,
+        "rows": rows,
+        "bytes": os.path.getsize(path),
+        "dirty_counts": dirty_counts
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic sales data file")
+    parser.add_argument("output", help="path of the file to write")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--products", type=int, default=50)
+    parser.add_argument("--customers", type=int, help="default: rows // 10")
+    parser.add_argument("--regions", type=int, default=4)
+    parser.add_argument("--dirty-ratio", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    info = generate_sales_file(args.output, args.rows, args.products, args.customers,
+                               args.regions, args.dirty_ratio, args.seed)
+    print(f"Wrote {info['rows']:,} rows ({info['bytes']:,} bytes) to '{info['path']}'")
+    for kind, count in sorted(info["dirty_counts"].items()):
+        print(f"  {kind}: {count:,}")
+
+if __name__ == "__main__":
+    main()
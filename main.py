@@ -1,91 +1,339 @@
-def main():
-    import sys
+import argparse
+import sys
+
+from utils.file_handler import (
+    read_sales_data,
+    parse_transactions,
+    validate_and_filter,
+    build_transaction_index
+)
+from utils.data_processor import (
+    analyze_sales,
+    analyze_aggregates,
+    set_backend,
+    ANALYTICS_BACKENDS
+)
+from utils.parallel import parallel_load
+from utils.incremental import incremental_analyze
+from utils.api_handler import (
+    prefetch_all_products,
+    create_product_mapping,
+    enrich_sales_data,
+    save_enriched_data
+)
+from utils.transaction_table import TransactionTable
+from utils.table_cache import load_sales_table
+from utils.pipeline_stats import PipelineTimer
+from utils.instrumentation import instrument_run
+from output.sales_report import generate_sales_report
+
+SALES_FILE = "data/sales_data.txt"
+ENRICHED_FILE = "data/enriched_sales_data.txt"
+REPORT_FILE = "output/sales_report.txt"
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Sales analytics pipeline. Without --batch (or filter "
+                    "arguments) the filters are asked for interactively."
+    )
+    parser.add_argument("--batch", action="store_true",
+                        help="run without prompts (implied by --region/--min-amount/--max-amount)")
+    parser.add_argument("--input", default=SALES_FILE, help=f"sales file (default: {SALES_FILE})")
+    parser.add_argument("--region", help="keep only this region")
+    parser.add_argument("--min-amount", type=float, help="minimum transaction amount")
+    parser.add_argument("--max-amount", type=float, help="maximum transaction amount")
+    parser.add_argument("--enriched-output", default=ENRICHED_FILE,
+                        help=f"enriched data file (default: {ENRICHED_FILE})")
+    parser.add_argument("--report-output", default=REPORT_FILE,
+                        help=f"report file (default: {REPORT_FILE})")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="processes for steps 1-5; >1 reads, parses, validates and "
+                             "aggregates the sales file on a process pool and implies "
+                             "--batch (default: 1)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="take step 5 from the checkpoint of the previous run "
+                             "(<input>.checkpoint.json), aggregating only appended lines; "
+                             "steps 1-4 and 7-9 still read the whole file, so the run "
+                             "is not faster")
+    parser.add_argument("--backend", choices=ANALYTICS_BACKENDS,
+                        help="analytics backend (default: python); numpy only applies "
+                             "to columnar input (--table-cache), other runs stay on python")
+    parser.add_argument("--table-cache", action="store_true",
+                        help="load the parsed file from its binary table cache "
+                             "(<input>.tblcache, rebuilt when the file changes)")
+    parser.add_argument("--summary-output",
+                        help="write stage timings, rows/sec and peak RSS as JSON "
+                             "to this file ('-' for stdout)")
+    parser.add_argument("--instrument", action="store_true",
+                        help="record calls, rows, time and rejects per pipeline function "
+                             "and print them at the end (implied by the options below)")
+    parser.add_argument("--instrument-output",
+                        help="write the per-function stats as JSON to this file ('-' for stdout)")
+    parser.add_argument("--stacks-output",
+                        help="write per-call-stack self time in collapsed format "
+                             "(flamegraph.pl / speedscope) to this file")
+    parser.add_argument("--profile-output", help="run under cProfile and dump the stats to this file")
+    parser.add_argument("--trace-allocations", action="store_true",
+                        help="also record allocated bytes per function (tracemalloc, slow)")
+
+    args = parser.parse_args(argv)
+    if args.incremental and args.workers > 1:
+        parser.error("--incremental cannot be combined with --workers > 1")
+    if args.table_cache and args.workers > 1:
+        parser.error("--table-cache cannot be combined with --workers > 1")
+    # Pool workers filter while they parse, so the filters must be known
+    # up front
+    args.batch = args.batch or args.workers > 1 or any(
+        value is not None for value in (args.region, args.min_amount, args.max_amount)
+    )
+    args.instrument = args.instrument or args.trace_allocations or any(
+        (args.instrument_output, args.stacks_output, args.profile_output)
+    )
+    return args
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    if not args.instrument:
+        return run_pipeline(args)
+
+    with instrument_run(
+        stats_file=args.instrument_output,
+        stacks_file=args.stacks_output,
+        profile_file=args.profile_output,
+        trace_allocations=args.trace_allocations,
+        show=True
+    ):
+        return run_pipeline(args)
+
+def batch_filters(args):
+    """
+    Returns: (apply_filter, region, min_amount, max_amount) from the
+    command-line arguments, apply_filter being 'y' or 'n'
+    """
+
+    apply_filter = "y" if any(
+        value is not None for value in (args.region, args.min_amount, args.max_amount)
+    ) else "n"
+    return apply_filter, args.region, args.min_amount, args.max_amount
+
+def run_pipeline(args):
+    """
+    Runs the ten pipeline steps with the parsed command-line arguments
+
+    Returns: process exit code (0 on success, 1 on error)
+    """
+
+    timer = PipelineTimer()
+
     try:
+        if args.backend:
+            set_backend(args.backend)
+
         print("="*40)
         print(" " * 10 + "SALES ANALYTICS SYSTEM")
         print("="*40 + "\n")
 
+        # read_sales_data reports a missing file and returns no lines;
+        # check it here so the run fails before any output is written
+        sales_file = args.input
+        with open(sales_file, "rb"):
+            pass
+
+        # Catalog fetch (cache lookup + network) runs in the background
+        # while the file is read, parsed, validated and analyzed
+        catalog_future = prefetch_all_products()
+
         # ---------- 1. Read sales data ----------
         print("[1/10] Reading sales data...")
-        sales_file = "data/sales_data.txt"  # Adjust path if needed
-        raw_lines = read_sales_data(sales_file)
-        print(f"✓ Successfully read {len(raw_lines)} transactions\n")
+        pooled = args.workers > 1
+        if pooled:
+            apply_filter, region_filter, min_val, max_val = batch_filters(args)
+        with timer.stage("pool_load" if pooled else "read") as stage:
+            read_info = {}
+            if pooled:
+                # Steps 1-4 run in the workers: each one reads, parses,
+                # validates, filters and aggregates a byte range of the file
+                # and sends back its valid rows
+                aggregates, validation_summary, valid_transactions = parallel_load(
+                    sales_file, args.workers, region_filter, min_val, max_val
+                )
+                line_count = validation_summary["total_input"]
+                read_info["encoding"] = f"decoded by {args.workers} worker processes"
+            elif args.table_cache:
+                # Parsed columns straight from the binary cache when the
+                # file is unchanged (parsed and cached otherwise)
+                transactions = load_sales_table(sales_file, read_info=read_info)
+                line_count = read_info.get("line_count", 0)
+            else:
+                raw_lines = read_sales_data(sales_file, read_info=read_info)
+                line_count = len(raw_lines)
+            stage["rows"] = line_count
+        cache_text = f", table cache: {read_info['cache']}" if args.table_cache else ""
+        print(f"✓ Successfully read {line_count} transactions "
+              f"(encoding: {read_info.get('encoding', 'n/a')}{cache_text}) {timer.last_stage_text()}\n")
 
         # ---------- 2. Parse and clean ----------
         print("[2/10] Parsing and cleaning data...")
-        transactions = parse_transactions(raw_lines)
-        print(f"✓ Parsed {len(transactions)} records\n")
+        if pooled:
+            print(f"✓ Parsed {line_count} records in the worker processes (step 1)\n")
+        else:
+            with timer.stage("parse") as stage:
+                if not args.table_cache:
+                    transactions = parse_transactions(raw_lines)
+                # Validated and indexed once; filters are answered from the index
+                transaction_index = build_transaction_index(transactions)
+                stage["rows"] = line_count
+            print(f"✓ Parsed {len(transactions)} records {timer.last_stage_text()}\n")
 
         # ---------- 3. Display filter options ----------
         print("[3/10] Filter Options Available:")
-        available_regions = sorted(set(t["Region"] for t in transactions if t.get("Region")))
-        amounts = [t["Quantity"] * t["UnitPrice"] for t in transactions]
-        min_amount, max_amount = min(amounts), max(amounts)
-        print(f"Regions: {', '.join(available_regions)}")
-        print(f"Amount Range: ₹{min_amount:,.0f} - ₹{max_amount:,.0f}\n")
-
-        apply_filter = input("Do you want to filter data? (y/n): ").strip().lower()
-        filtered_transactions = transactions
-        if apply_filter == "y":
-            region_input = input(f"Enter region to filter ({', '.join(available_regions)}): ").strip()
-            min_input = input(f"Enter minimum transaction amount (default {min_amount}): ").strip()
-            max_input = input(f"Enter maximum transaction amount (default {max_amount}): ").strip()
-
-            min_val = float(min_input) if min_input else None
-            max_val = float(max_input) if max_input else None
-
-            filtered_transactions, invalid_count, summary = validate_and_filter(
-                transactions,
-                region=region_input if region_input else None,
-                min_amount=min_val,
-                max_amount=max_val
-            )
-            print(f"✓ Filter applied: {len(filtered_transactions)} records remaining\n")
+        if pooled:
+            # The workers filtered while parsing; there is no full scan here
+            print("Regions / Amount Range: not scanned with --workers > 1\n")
+        else:
+            # Collected while the index was built; no extra scan
+            available_regions = transaction_index.input_info["available_regions"]
+            min_amount, max_amount = transaction_index.input_info["raw_amount_range"] or (None, None)
+            print(f"Regions: {', '.join(available_regions)}")
+            if min_amount is None:
+                print("Amount Range: N/A\n")
+            else:
+                print(f"Amount Range: ₹{min_amount:,.0f} - ₹{max_amount:,.0f}\n")
+
+        if args.batch:
+            apply_filter, region_filter, min_val, max_val = batch_filters(args)
+            if apply_filter == "y":
+                print(f"Filters: region={region_filter}, min_amount={min_val}, max_amount={max_val}\n")
+        else:
+            apply_filter = input("Do you want to filter data? (y/n): ").strip().lower()
+            region_filter = min_val = max_val = None
+            if apply_filter == "y":
+                region_input = input(f"Enter region to filter ({', '.join(available_regions)}): ").strip()
+                min_input = input(f"Enter minimum transaction amount (default {min_amount}): ").strip()
+                max_input = input(f"Enter maximum transaction amount (default {max_amount}): ").strip()
+
+                region_filter = region_input if region_input else None
+                min_val = float(min_input) if min_input else None
+                max_val = float(max_input) if max_input else None
 
         # ---------- 4. Validate ----------
         print("[4/10] Validating transactions...")
-        valid_transactions, invalid_count, validation_summary = validate_and_filter(filtered_transactions)
-        print(f"✓ Valid: {len(valid_transactions)} | Invalid: {invalid_count}\n")
+        if pooled:
+            # Counted by the workers (parallel_load)
+            invalid_count = validation_summary["invalid"]
+            stage_text = "(worker processes, step 1)"
+        else:
+            with timer.stage("validate") as stage:
+                valid_transactions, invalid_count, validation_summary = validate_and_filter(
+                    transaction_index,
+                    region=region_filter,
+                    min_amount=min_val,
+                    max_amount=max_val
+                )
+                stage["rows"] = len(transactions)
+            stage_text = timer.last_stage_text()
+        if apply_filter == "y":
+            print(f"✓ Filter applied: {len(valid_transactions)} records remaining")
+        print(f"✓ Valid: {len(valid_transactions)} | Invalid: {invalid_count} {stage_text}\n")
 
         # ---------- 5. Perform analytics ----------
         print("[5/10] Analyzing sales data...")
-        total_revenue = calculate_total_revenue(valid_transactions)
-        region_stats = region_wise_sales(valid_transactions)
-        top_products = top_selling_products(valid_transactions)
-        customer_stats = customer_analysis(valid_transactions)
-        daily_stats = daily_sales_trend(valid_transactions)
-        peak_day = find_peak_sales_day(valid_transactions)
-        low_products = low_performing_products(valid_transactions)
-        print("✓ Analysis complete\n")
+        with timer.stage("analyze") as stage:
+            if pooled:
+                # Views over the aggregates merged from the workers
+                analytics = analyze_aggregates(aggregates)
+                stage["rows"] = len(valid_transactions)
+            elif args.incremental:
+                # Only the bytes appended since the last run are aggregated;
+                # the rest comes from the checkpoint (<input>.checkpoint.json).
+                # Steps 1-4 above still parsed the whole file for enrichment,
+                # and the checkpoint round trip costs about as much as
+                # aggregating, so this keeps the checkpoint current rather
+                # than saving time
+                analytics, _, incremental_info = incremental_analyze(
+                    sales_file, region=region_filter, min_amount=min_val, max_amount=max_val
+                )
+                stage["rows"] = len(valid_transactions)
+            else:
+                # Single aggregation pass shared by every analytics view
+                analytics = analyze_sales(valid_transactions)
+                stage["rows"] = len(valid_transactions)
+        if args.incremental:
+            print(f"✓ Analysis complete ({incremental_info['mode']} run, bytes "
+                  f"{incremental_info['start_offset']:,}-{incremental_info['end_offset']:,} "
+                  f"aggregated) {timer.last_stage_text()}\n")
+        else:
+            print(f"✓ Analysis complete {timer.last_stage_text()}\n")
 
         # ---------- 6. Fetch product data ----------
         print("[6/10] Fetching product data from API...")
-        api_products = fetch_all_products()
-        print(f"✓ Fetched {len(api_products)} products\n")
+        with timer.stage("fetch_wait") as stage:
+            api_products, fetch_messages = catalog_future.result()
+            stage["rows"] = len(api_products)
+        for message in fetch_messages:
+            print(message)
+        print(f"✓ Fetched {len(api_products)} products {timer.last_stage_text()}\n")
 
         # ---------- 7. Enrich sales data ----------
         print("[7/10] Enriching sales data...")
-        product_map = create_product_mapping(api_products)
-        enriched_txns = enrich_sales_data(valid_transactions, product_map)
+        with timer.stage("enrich") as stage:
+            if isinstance(valid_transactions, TransactionTable):
+                product_ids = valid_transactions.column("ProductID")
+            else:
+                product_ids = (t["ProductID"] for t in valid_transactions)
+            product_map = create_product_mapping(api_products, product_ids=product_ids)
+            enriched_txns = enrich_sales_data(valid_transactions, product_map)
+            stage["rows"] = len(enriched_txns)
         enriched_count = sum(1 for t in enriched_txns if t.get("API_Match"))
         success_rate = (enriched_count / len(enriched_txns) * 100) if enriched_txns else 0
-        print(f"✓ Enriched {enriched_count}/{len(enriched_txns)} transactions ({success_rate:.1f}%)\n")
+        print(f"✓ Enriched {enriched_count}/{len(enriched_txns)} transactions ({success_rate:.1f}%) "
+              f"{timer.last_stage_text()}\n")
 
         # ---------- 8. Save enriched data ----------
         print("[8/10] Saving enriched data...")
-        save_enriched_data(enriched_txns)
-        print("✓ Saved to: data/enriched_sales_data.txt\n")
+        with timer.stage("save_enriched") as stage:
+            save_enriched_data(enriched_txns, args.enriched_output)
+            stage["rows"] = len(enriched_txns)
+        print(f"✓ Saved to: {args.enriched_output} {timer.last_stage_text()}\n")
 
         # ---------- 9. Generate report ----------
         print("[9/10] Generating report...")
-        generate_sales_report(valid_transactions, enriched_txns)
-        print("✓ Report saved to: output/sales_report.txt\n")
+        with timer.stage("report") as stage:
+            generate_sales_report(
+                valid_transactions, enriched_txns, args.report_output, analytics=analytics
+            )
+            stage["rows"] = len(valid_transactions)
+        print(f"✓ Report saved to: {args.report_output} {timer.last_stage_text()}\n")
 
         # ---------- 10. Complete ----------
         print("[10/10] Process Complete!")
         print("="*40)
 
+        summary = timer.summary()
+        print(f"Total: {summary['total_seconds']:.3f}s", end="")
+        if summary["peak_rss_bytes"] is not None:
+            print(f" | Peak RSS: {summary['peak_rss_bytes'] / (1024 * 1024):.1f} MiB", end="")
+        print()
+
+        if args.summary_output:
+            timer.write_summary(
+                args.summary_output,
+                input_file=sales_file,
+                workers=args.workers,
+                filters={"region": region_filter, "min_amount": min_val, "max_amount": max_val},
+                filter_summary=validation_summary
+            )
+
+        return 0
+
     except FileNotFoundError as fe:
         print(f"Error: {fe}")
     except Exception as e:
         print(f"An unexpected error occurred: {e}", file=sys.stderr)
+
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,126 @@
+"""
+Product catalog fetch against a local stub of the DummyJSON /products API
+
+Run from the project root:
+    python -m unittest tests.test_api_handler
+"""
+
+import json
+import os
+import socket
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from utils.api_handler import fetch_all_products, get_cache_stats
+
+STUB_PRODUCTS = [
+    {"id": i, "title": f"Item {i}", "category": "misc", "brand": "Brand", "rating": 4.5}
+    for i in range(1, 26)
+]
+STUB_MAX_LIMIT = 10  # the stub caps 'limit' like the real API does
+STUB_ETAG = '"catalog-v1"'
+
+class CatalogStubHandler(BaseHTTPRequestHandler):
+    """
+    Serves STUB_PRODUCTS in pages of at most STUB_MAX_LIMIT, with an ETag;
+    answers 304 when If-None-Match matches
+    """
+
+    def do_GET(self):
+        self.server.requests.append(self.path)
+
+        if self.headers.get("If-None-Match") == STUB_ETAG:
+            self.send_response(304)
+            self.send_header("ETag", STUB_ETAG)
+            self.end_headers()
+            return
+
+        query = parse_qs(urlsplit(self.path).query)
+        limit = min(int(query.get("limit", ["30"])[0]), STUB_MAX_LIMIT)
+        skip = int(query.get("skip", ["0"])[0])
+
+        body = json.dumps({
+            "products": STUB_PRODUCTS[skip:skip + limit],
+            "total": len(STUB_PRODUCTS),
+            "skip": skip,
+            "limit": limit
+        }).encode("utf-8")
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", STUB_ETAG)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def unused_port():
+    """
+    Returns: a local port nothing is listening on
+    """
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+class FetchAllProductsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), CatalogStubHandler)
+        self.server.requests = []
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/products"
+
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache_file = os.path.join(self.temp_dir.name, "catalog.json")
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.temp_dir.cleanup()
+
+    def fetch(self, **kwargs):
+        kwargs.setdefault("cache_file", self.cache_file)
+        return fetch_all_products(log=lambda message: None, **kwargs)
+
+    def test_pages_by_returned_page_size(self):
+        products = self.fetch(use_cache=False, url=self.url)
+
+        self.assertEqual([p["id"] for p in products], [p["id"] for p in STUB_PRODUCTS])
+        # 25 products in pages of 10: skip=0, 10, 20
+        self.assertEqual(len(self.server.requests), 3)
+
+    def test_not_modified_reuses_cache(self):
+        self.fetch(url=self.url)
+        self.server.requests.clear()
+        revalidated = get_cache_stats()["revalidated"]
+
+        products = self.fetch(url=self.url, refresh=True)
+
+        self.assertEqual(len(products), len(STUB_PRODUCTS))
+        # Only the conditional first page was requested
+        self.assertEqual(len(self.server.requests), 1)
+        self.assertEqual(get_cache_stats()["revalidated"], revalidated + 1)
+
+    def test_offline_falls_back_to_stale_cache(self):
+        self.fetch(url=self.url)
+        stale_hits = get_cache_stats()["stale_hits"]
+
+        offline_url = f"http://127.0.0.1:{unused_port()}/products"
+        products = self.fetch(url=offline_url, ttl=0)
+
+        self.assertEqual(len(products), len(STUB_PRODUCTS))
+        self.assertEqual(get_cache_stats()["stale_hits"], stale_hits + 1)
+
+    def test_offline_without_cache_returns_nothing(self):
+        offline_url = f"http://127.0.0.1:{unused_port()}/products"
+
+        self.assertEqual(self.fetch(url=offline_url, use_cache=False), [])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,39 +1,291 @@
-Task 3.1 
-A)
+#Task 3.1
+# A)
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from operator import itemgetter
+
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from utils.instrumentation import instrumented, rows_from_result
+from utils.output_writer import open_output, write_lines
+
+PRODUCTS_URL = "https://dummyjson.com/products"
+PAGE_SIZE = 100
+MAX_CONCURRENT_REQUESTS = 4
+REQUEST_TIMEOUT = 10  # seconds
+CATALOG_CACHE_FILE = "data/product_catalog_cache.json"
+CATALOG_CACHE_TTL = 24 * 60 * 60  # seconds
+
+# Counters for the product catalog cache, see get_cache_stats()
+cache_stats = {
+    "hits": 0,          # fresh cache used, no HTTP request
+    "misses": 0,        # cache missing or expired, HTTP request made
+    "revalidated": 0,   # server answered 304 Not Modified
+    "stale_hits": 0     # request failed, last good snapshot used
+}
+
+def load_catalog_cache(cache_file=CATALOG_CACHE_FILE):
+    """
+    Loads the cached product catalog snapshot
+
+    Returns: dictionary with keys
+    ['fetched_at', 'etag', 'last_modified', 'products'], or None when
+    there is no readable cache
+    """
+
+    try:
+        with open(cache_file, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if not isinstance(cache, dict) or not isinstance(cache.get("products"), list):
+        return None
+
+    return cache
+
+def save_catalog_cache(products, cache_file=CATALOG_CACHE_FILE, etag=None, last_modified=None):
+    """
+    Writes a product catalog snapshot atomically (temp file + rename) so
+    an interrupted run never leaves a half-written cache behind
+    """
+
+    directory = os.path.dirname(cache_file)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    cache = {
+        "fetched_at": time.time(),
+        "etag": etag,
+        "last_modified": last_modified,
+        "products": products
+    }
+
+    temp_file = cache_file + ".tmp"
+    try:
+        with open(temp_file, "w", encoding="utf-8") as f:
+            json.dump(cache, f)
+        os.replace(temp_file, cache_file)
+    except OSError as e:
+        print(f"Warning: could not write product cache '{cache_file}': {e}")
+
+def invalidate_catalog_cache(cache_file=CATALOG_CACHE_FILE):
+    """
+    Deletes the cached product catalog so the next fetch goes to the API
+    """
+
+    try:
+        os.remove(cache_file)
+    except FileNotFoundError:
+        pass
 
-def fetch_all_products():
+def get_cache_stats():
+    """
+    Returns: copy of the catalog cache hit/miss counters
+    """
+
+    return dict(cache_stats)
+
+_session = None
+
+def get_session():
+    """
+    Returns the shared keep-alive HTTP session
+
+    The connection pool is sized for MAX_CONCURRENT_REQUESTS, and failed
+    GETs (connection errors, 429 and 5xx) are retried with exponential
+    backoff.
+    """
+
+    global _session
+
+    if _session is None:
+        retry = Retry(
+            total=3,
+            backoff_factor=0.5,
+            status_forcelist=[429, 500, 502, 503, 504],
+            allowed_methods=["GET"]
+        )
+        adapter = HTTPAdapter(
+            pool_connections=MAX_CONCURRENT_REQUESTS,
+            pool_maxsize=MAX_CONCURRENT_REQUESTS,
+            max_retries=retry
+        )
+        _session = requests.Session()
+        _session.mount("http://", adapter)
+        _session.mount("https://", adapter)
+
+    return _session
+
+def fetch_catalog_pages(headers=None, page_size=PAGE_SIZE,
+                        max_workers=MAX_CONCURRENT_REQUESTS, url=PRODUCTS_URL):
+    """
+    Fetches every page of the product catalog
+
+    The first page reports the catalog 'total'; the remaining pages are
+    then requested concurrently (at most max_workers at a time) over the
+    shared session and reassembled in order.
+
+    Parameters:
+    - headers: extra headers for the first request (conditional refresh)
+    - url: catalog endpoint (e.g. a local stub server in tests)
+
+    Returns: (products, first_response); products is None when the first
+    request was answered with 304 Not Modified
+
+    Raises: requests.exceptions.RequestException if any page fails
+    """
+
+    session = get_session()
+
+    def get_page(skip, extra_headers=None):
+        response = session.get(
+            url,
+            params={"limit": page_size, "skip": skip},
+            headers=extra_headers,
+            timeout=REQUEST_TIMEOUT
+        )
+        if response.status_code != 304:
+            response.raise_for_status()
+        return response
+
+    first = get_page(0, headers)
+    if first.status_code == 304:
+        return None, first
+
+    data = first.json()
+    products = data.get("products", [])
+    total = data.get("total", len(products))
+
+    # Step by what the server actually returned: it may cap 'limit'
+    # below page_size, and stepping by page_size would skip products
+    returned = len(products)
+    skips = list(range(returned, total, returned)) if returned else []
+
+    if skips:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            pages = executor.map(get_page, skips)
+            for response in pages:
+                products.extend(response.json().get("products", []))
+
+    return products, first
+
+@instrumented(rows=rows_from_result)
+def fetch_all_products(use_cache=True, cache_file=CATALOG_CACHE_FILE,
+                       ttl=CATALOG_CACHE_TTL, refresh=False, log=print, url=PRODUCTS_URL):
     """
     Fetches all products from DummyJSON API
 
+    All pages of the catalog are fetched (see fetch_catalog_pages). The
+    catalog is cached on disk. A snapshot younger than ttl seconds is
+    returned without any HTTP request; an older one is revalidated with a
+    conditional request (ETag / Last-Modified). If the API cannot be
+    reached, the last good snapshot is used instead.
+
+    Parameters:
+    - use_cache: set False to bypass the cache entirely
+    - refresh: ignore the TTL and revalidate against the API
+    - log: callable receiving the status messages (default: print)
+    - url: catalog endpoint (default: PRODUCTS_URL)
+
     Returns: list of product dictionaries
     """
 
-    url = "https://dummyjson.com/products"
-    params = {"limit": 100}
+    cache = load_catalog_cache(cache_file) if use_cache else None
 
-    try:
-        response = requests.get(url, params=params, timeout=10)
-        response.raise_for_status()
+    if cache is not None and not refresh:
+        age = time.time() - cache.get("fetched_at", 0)
+        if 0 <= age < ttl:
+            cache_stats["hits"] += 1
+            products = cache["products"]
+            log(f"Using cached product catalog ({len(products)} products, {age:.0f}s old).")
+            return products
+
+    cache_stats["misses"] += 1
 
-        data = response.json()
-        products = data.get("products", [])
+    # Conditional refresh: let the server answer 304 if nothing changed
+    headers = {}
+    if cache is not None:
+        if cache.get("etag"):
+            headers["If-None-Match"] = cache["etag"]
+        if cache.get("last_modified"):
+            headers["If-Modified-Since"] = cache["last_modified"]
 
-        print(f"Successfully fetched {len(products)} products.")
+    try:
+        products, response = fetch_catalog_pages(headers, url=url)
+
+        if products is None:
+            cache_stats["revalidated"] += 1
+            products = cache["products"] if cache is not None else []
+            if cache is not None:
+                save_catalog_cache(products, cache_file, cache.get("etag"), cache.get("last_modified"))
+            log(f"Product catalog unchanged ({len(products)} products).")
+            return products
+
+        if use_cache:
+            save_catalog_cache(
+                products,
+                cache_file,
+                response.headers.get("ETag"),
+                response.headers.get("Last-Modified")
+            )
+
+        log(f"Successfully fetched {len(products)} products.")
         return products
 
-    except requests.exceptions.RequestException as e:
-        print("Failed to fetch products from DummyJSON API.")
-        print(f"Error: {e}")
+    except (requests.exceptions.RequestException, ValueError) as e:
+        log("Failed to fetch products from DummyJSON API.")
+        log(f"Error: {e}")
+
+        if cache is not None:
+            cache_stats["stale_hits"] += 1
+            products = cache["products"]
+            log(f"Using last cached product catalog ({len(products)} products).")
+            return products
+
         return []
 
-B)
-def create_product_mapping(api_products):
+def prefetch_all_products(**kwargs):
+    """
+    Starts fetch_all_products (cache lookup included) on a background
+    thread, so the network wait overlaps with parsing and analytics
+    instead of adding to them
+
+    The status messages are collected rather than printed, so they do
+    not interleave with the caller's output; print them when the result
+    is used.
+
+    Parameters: same keyword arguments as fetch_all_products
+
+    Returns: concurrent.futures.Future resolving to (products, messages)
+    """
+
+    def fetch():
+        messages = []
+        products = fetch_all_products(log=messages.append, **kwargs)
+        return products, messages
+
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="catalog-prefetch")
+    future = executor.submit(fetch)
+    executor.shutdown(wait=False)
+
+    return future
+
+# B)
+@instrumented()
+def create_product_mapping(api_products, product_ids=None):
     """
     Creates a mapping of product IDs to product info
 
     Parameters:
     - api_products: list of product dictionaries from fetch_all_products()
+    - product_ids: optional iterable of sales-file ProductID strings
+      (e.g. 'P101'); when given, the mapping is keyed by those strings
+      instead, each resolved once, so enrichment is a single dict hit
 
     Returns: dictionary mapping product IDs to product info
     """
@@ -58,95 +310,114 @@ def create_product_mapping(api_products):
             # Skip malformed product entries
             continue
 
+    if product_ids is not None:
+        return {
+            product_id: info
+            for product_id, info in (
+                (product_id, lookup_product(product_mapping, product_id))
+                for product_id in set(product_ids)
+            )
+            if info
+        }
+
     return product_mapping
 
-Task 3.2
+def lookup_product(product_mapping, product_id):
+    """
+    Resolves a sales-file ProductID against a product mapping
 
-import os
+    Accepts mappings keyed by the ProductID string itself or by the
+    numeric API id (P101 → 101).
 
-def enrich_sales_data(transactions, product_mapping):
+    Returns: product info dictionary, or None when there is no match
+    """
+
+    info = product_mapping.get(product_id)
+    if info is not None:
+        return info
+
+    try:
+        # Extract numeric ID from ProductID (P101 → 101)
+        numeric_id = int("".join(filter(str.isdigit, product_id)))
+    except (TypeError, ValueError):
+        return None
+
+    return product_mapping.get(numeric_id)
+
+#Task 3.2
+
+ENRICHED_HEADER_FIELDS = [
+    "TransactionID", "Date", "ProductID", "ProductName",
+    "Quantity", "UnitPrice", "CustomerID", "Region",
+    "API_Category", "API_Brand", "API_Rating", "API_Match"
+]
+
+@instrumented(rejects=lambda args, kwargs, result: {
+    "no_api_match": sum(1 for t in result if not t["API_Match"])
+})
+def enrich_sales_data(transactions, product_mapping, output_file=None, copy=False):
     """
     Enriches transaction data with API product information
 
     Parameters:
     - transactions: list of transaction dictionaries
-    - product_mapping: dictionary from create_product_mapping()
+    - product_mapping: dictionary from create_product_mapping(), keyed by
+      numeric API id or by ProductID string
+    - output_file: optional path; when given the enriched rows are written
+      with save_enriched_data (main.py saves once itself instead)
+    - copy: set True to enrich copies and leave the input dictionaries
+      untouched; by default the API fields are added to the records in
+      place, which avoids copying every transaction
 
     Returns: list of enriched transaction dictionaries
     """
 
     enriched_transactions = []
 
-    # Ensure output directory exists
-    os.makedirs("data", exist_ok=True)
-    output_file = "data/enriched_sales_data.txt"
+    no_match = {
+        "API_Category": None,
+        "API_Brand": None,
+        "API_Rating": None,
+        "API_Match": False
+    }
 
-    # Define new header including API fields
-    header_fields = [
-        "TransactionID", "Date", "ProductID", "ProductName",
-        "Quantity", "UnitPrice", "CustomerID", "Region",
-        "API_Category", "API_Brand", "API_Rating", "API_Match"
-    ]
+    # API fields per distinct ProductID, resolved on first sight
+    fields_by_id = {}
 
     # ---------- Enrich each transaction ----------
     for t in transactions:
-        enriched = t.copy()
+        enriched = t.copy() if copy else t
 
-        try:
-            # Extract numeric ID from ProductID (P101 → 101)
-            product_id_str = t.get("ProductID", "")
-            numeric_id = int("".join(filter(str.isdigit, product_id_str)))
+        product_id = t.get("ProductID")
+        fields = fields_by_id.get(product_id)
 
-            api_info = product_mapping.get(numeric_id)
+        if fields is None:
+            api_info = lookup_product(product_mapping, product_id)
 
             if api_info:
-                enriched["API_Category"] = api_info.get("category")
-                enriched["API_Brand"] = api_info.get("brand")
-                enriched["API_Rating"] = api_info.get("rating")
-                enriched["API_Match"] = True
+                fields = {
+                    "API_Category": api_info.get("category"),
+                    "API_Brand": api_info.get("brand"),
+                    "API_Rating": api_info.get("rating"),
+                    "API_Match": True
+                }
             else:
                 # No match
-                enriched["API_Category"] = None
-                enriched["API_Brand"] = None
-                enriched["API_Rating"] = None
-                enriched["API_Match"] = False
-
-        except Exception:
-            # On any error, mark as no match
-            enriched["API_Category"] = None
-            enriched["API_Brand"] = None
-            enriched["API_Rating"] = None
-            enriched["API_Match"] = False
+                fields = no_match
 
+            fields_by_id[product_id] = fields
+
+        enriched.update(fields)
         enriched_transactions.append(enriched)
 
-    # ---------- Save to pipe-delimited file ----------
-    with open(output_file, "w", encoding="utf-8") as f:
-        # Write header
-        f.write("|".join(header_fields) + "\n")
-
-        # Write records
-        for t in enriched_transactions:
-            row = [
-                str(t.get("TransactionID", "")),
-                str(t.get("Date", "")),
-                str(t.get("ProductID", "")),
-                str(t.get("ProductName", "")),
-                str(t.get("Quantity", "")),
-                str(t.get("UnitPrice", "")),
-                str(t.get("CustomerID", "")),
-                str(t.get("Region", "")),
-                str(t.get("API_Category", "")),
-                str(t.get("API_Brand", "")),
-                str(t.get("API_Rating", "")),
-                str(t.get("API_Match", ""))
-            ]
-            f.write("|".join(row) + "\n")
-
-    print(f"Enriched sales data saved to '{output_file}'")
+    if output_file:
+        save_enriched_data(enriched_transactions, output_file)
+
     return enriched_transactions
 
-def save_enriched_data(enriched_transactions, filename='data/enriched_sales_data.txt'):
+@instrumented()
+def save_enriched_data(enriched_transactions, filename='data/enriched_sales_data.txt',
+                       compression="auto"):
     """
     Saves enriched transactions back to file
 
@@ -154,34 +425,63 @@ def save_enriched_data(enriched_transactions, filename='data/enriched_sales_data
     TransactionID|Date|ProductID|ProductName|Quantity|UnitPrice|CustomerID|Region|API_Category|API_Brand|API_Rating|API_Match
     T001|2024-12-01|P101|Laptop|2|45000.0|C001|North|laptops|Apple|4.7|True
     ...
-    """
 
-    # Ensure output directory exists
-    os.makedirs(os.path.dirname(filename), exist_ok=True)
-
-    # Define full header including new API fields
-    header_fields = [
-        "TransactionID", "Date", "ProductID", "ProductName",
-        "Quantity", "UnitPrice", "CustomerID", "Region",
-        "API_Category", "API_Brand", "API_Rating", "API_Match"
-    ]
+    Rows are formatted and written in batches (see utils/output_writer).
+    A filename ending in .gz, .bz2, .xz or .zst is compressed, or pass
+    compression explicitly ('gzip', 'bz2', 'xz', 'zstd' or None).
+    """
 
     try:
-        with open(filename, "w", encoding="utf-8") as f:
-            # Write header
-            f.write("|".join(header_fields) + "\n")
-
-            # Write each enriched transaction
-            for t in enriched_transactions:
-                row = []
-                for field in header_fields:
-                    value = t.get(field, "")
-                    if value is None:
-                        value = ""
-                    row.append(str(value))
-                f.write("|".join(row) + "\n")
+        with open_output(filename, compression) as f:
+            write_lines(f, iter_enriched_lines(enriched_transactions))
 
         print(f"Enriched transactions successfully saved to '{filename}'.")
 
     except Exception as e:
         print(f"Error saving enriched data: {e}")
+
+def iter_enriched_lines(enriched_transactions):
+    """
+    Yields: the header, then one newline-terminated line per transaction
+    in the save_enriched_data format (None written as an empty field)
+    """
+
+    def format_row(t):
+        return "|".join(
+            "" if value is None else str(value)
+            for value in (t.get(field, "") for field in ENRICHED_HEADER_FIELDS)
+        ) + "\n"
+
+    yield "|".join(ENRICHED_HEADER_FIELDS) + "\n"
+
+    # The API fields repeat per product: their text is built once per
+    # distinct combination and the transaction fields go through one
+    # %-format. The cache key includes the value types, since equal values
+    # of different types print differently (5 vs 5.0, 1 vs True). Rows
+    # with missing keys or None values take format_row.
+    transaction_fields = itemgetter(*ENRICHED_HEADER_FIELDS[:8])
+    api_fields = itemgetter(*ENRICHED_HEADER_FIELDS[8:])
+    template = "|".join(["%s"] * 8) + "|"
+    api_suffixes = {}
+
+    for t in enriched_transactions:
+        try:
+            values = transaction_fields(t)
+            api_values = api_fields(t)
+            api_key = (api_values, tuple(map(type, api_values)))
+            suffix = api_suffixes.get(api_key)
+        except (KeyError, TypeError):
+            # Missing field or unhashable API value
+            yield format_row(t)
+            continue
+
+        if None in values:
+            yield format_row(t)
+            continue
+
+        if suffix is None:
+            suffix = api_suffixes[api_key] = "|".join(
+                "" if value is None else str(value) for value in api_values
+            ) + "\n"
+
+        yield template % values + suffix
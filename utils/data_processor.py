@@ -1,192 +1,726 @@
-Task 2.1
-a.
-def calculate_total_revenue(transactions):
+#Task 2.0
+# Aggregation engine
+import hashlib
+import heapq
+from collections import OrderedDict
+from itertools import islice
+
+from utils.transaction_table import TransactionTable, CATEGORICAL_COLUMNS
+from utils.numpy_backend import aggregate_numpy, numpy_available
+from utils.hyperloglog import HyperLogLog, distinct_counter_factory
+from utils.instrumentation import instrumented
+
+ANALYTICS_BACKENDS = ["python", "numpy"]
+_default_backend = "python"
+
+def set_backend(backend):
+    """
+    Selects the default analytics backend ('python' or 'numpy') used when
+    a function is called without an explicit backend
     """
-    Calculates total revenue from all transactions
 
-    Returns: float (total revenue)
+    global _default_backend
 
-    Expected Output: Single number representing sum of (Quantity * UnitPrice)
-    Example: 1545000.50
+    if backend not in ANALYTICS_BACKENDS:
+        raise ValueError(f"Unknown analytics backend '{backend}', expected one of {ANALYTICS_BACKENDS}")
+    if backend == "numpy" and not numpy_available():
+        raise ImportError("NumPy backend requested but numpy is not installed")
+
+    _default_backend = backend
+
+def get_backend():
     """
+    Returns: name of the default analytics backend
+    """
+
+    return _default_backend
+
+@instrumented()
+def aggregate_transactions(transactions, backend=None, approx_error=None):
+    """
+    Aggregates all transactions in a single pass
+
+    Every analytics function in this module is a view over this result,
+    so the transaction list is scanned once no matter how many of them
+    are needed (see analyze_sales).
+
+    Returns: dictionary of raw aggregates:
+    {
+        'total_revenue': float,
+        'transaction_count': int,
+        'region_total': float,
+        'regions': {Region: [total_sales, transaction_count]},
+        'products': {ProductName: [total_quantity, total_revenue]},
+        'customers': {CustomerID: [total_spent, purchase_count, set of ProductName]},
+        'daily': {Date: [revenue, transaction_count, set of CustomerID]},
+        'daily_totals': {Date: [revenue, transaction_count]}
+    }
+
+    Accepts a list (or any iterable) of transaction dictionaries, or a
+    TransactionTable. backend='numpy' runs the vectorized implementation
+    (utils.numpy_backend) on a TransactionTable; other input stays on
+    the Python loop, as converting dictionaries to columns row by row
+    costs more than NumPy saves. None uses the default set by
+    set_backend().
+
+    approx_error (e.g. 0.01) replaces the per-day customer sets with
+    fixed-size HyperLogLog sketches of that relative error, so memory per
+    day stays constant however many customers there are. Exact sets are
+    the default.
+    """
+
+    backend = backend or _default_backend
+
+    if backend == "numpy":
+        if isinstance(transactions, TransactionTable):
+            return aggregate_numpy(transactions, approx_error)
+    elif backend != "python":
+        raise ValueError(f"Unknown analytics backend '{backend}', expected one of {ANALYTICS_BACKENDS}")
+
+    if isinstance(transactions, TransactionTable):
+        return _aggregate_table(transactions, approx_error)
+
+    new_day_customers = distinct_counter_factory(approx_error)
 
     total_revenue = 0.0
+    transaction_count = 0
+    region_total = 0.0
+    regions = {}
+    products = {}
+    customers = {}
+    daily = {}
+    daily_totals = {}
 
     for t in transactions:
         try:
             quantity = t.get("Quantity", 0)
             unit_price = t.get("UnitPrice", 0.0)
 
-            if quantity > 0 and unit_price > 0:
-                total_revenue += quantity * unit_price
+            if quantity <= 0 or unit_price <= 0:
+                continue
+
+            amount = quantity * unit_price
 
         except (TypeError, ValueError):
             # Skip malformed records safely
             continue
 
-    return total_revenue
-
-b. 
-def region_wise_sales(transactions):
+        total_revenue += amount
+        transaction_count += 1
+
+        region = t.get("Region")
+        product = t.get("ProductName")
+        customer_id = t.get("CustomerID")
+        date = t.get("Date")
+
+        # ---------- Region ----------
+        if region:
+            region_total += amount
+            stats = regions.get(region)
+            if stats is None:
+                regions[region] = [amount, 1]
+            else:
+                stats[0] += amount
+                stats[1] += 1
+
+        # ---------- Product ----------
+        if product:
+            stats = products.get(product)
+            if stats is None:
+                products[product] = [quantity, amount]
+            else:
+                stats[0] += quantity
+                stats[1] += amount
+
+        # ---------- Customer ----------
+        if customer_id:
+            stats = customers.get(customer_id)
+            if stats is None:
+                customers[customer_id] = [amount, 1, {product}]
+            else:
+                stats[0] += amount
+                stats[1] += 1
+                stats[2].add(product)
+
+        # ---------- Date ----------
+        if date:
+            stats = daily_totals.get(date)
+            if stats is None:
+                daily_totals[date] = [amount, 1]
+            else:
+                stats[0] += amount
+                stats[1] += 1
+
+            if customer_id:
+                stats = daily.get(date)
+                if stats is None:
+                    members = new_day_customers()
+                    members.add(customer_id)
+                    daily[date] = [amount, 1, members]
+                else:
+                    stats[0] += amount
+                    stats[1] += 1
+                    stats[2].add(customer_id)
+
+    return {
+        "total_revenue": total_revenue,
+        "transaction_count": transaction_count,
+        "region_total": region_total,
+        "regions": regions,
+        "products": products,
+        "customers": customers,
+        "daily": daily,
+        "daily_totals": daily_totals
+    }
+
+def _aggregate_table(table, approx_error=None):
     """
-    Analyzes sales by region
+    aggregate_transactions for a TransactionTable
 
-    Returns: dictionary with region statistics
+    Groups on the integer category codes and only decodes them back to
+    strings once per group at the end.
+
+    Returns: dictionary of raw aggregates (see aggregate_transactions)
     """
 
-    region_stats = {}
-    total_sales_all_regions = 0.0
+    values = table.values
+    codes = table.codes
 
-    # ---------- Aggregate sales and counts ----------
-    for t in transactions:
+    # Truthiness of each category value, checked once per distinct value
+    region_ok = [bool(v) for v in values["Region"]]
+    product_ok = [bool(v) for v in values["ProductName"]]
+    customer_ok = [bool(v) for v in values["CustomerID"]]
+    date_ok = [bool(v) for v in values["Date"]]
+
+    # Exact mode collects customer codes per day; sketches need the
+    # decoded CustomerID so they hash the same in every table
+    exact_days = approx_error is None
+    new_day_customers = distinct_counter_factory(approx_error)
+    customer_values = values["CustomerID"]
+
+    total_revenue = 0.0
+    transaction_count = 0
+    region_total = 0.0
+    regions = {}
+    products = {}
+    customers = {}
+    daily = {}
+    daily_totals = {}
+
+    rows = zip(
+        table.quantities, table.unit_prices, codes["Region"],
+        codes["ProductName"], codes["CustomerID"], codes["Date"]
+    )
+
+    for quantity, unit_price, region, product, customer_id, date in rows:
+        if quantity <= 0 or unit_price <= 0:
+            continue
+
+        amount = quantity * unit_price
+        total_revenue += amount
+        transaction_count += 1
+
+        # ---------- Region ----------
+        if region_ok[region]:
+            region_total += amount
+            stats = regions.get(region)
+            if stats is None:
+                regions[region] = [amount, 1]
+            else:
+                stats[0] += amount
+                stats[1] += 1
+
+        # ---------- Product ----------
+        if product_ok[product]:
+            stats = products.get(product)
+            if stats is None:
+                products[product] = [quantity, amount]
+            else:
+                stats[0] += quantity
+                stats[1] += amount
+
+        # ---------- Customer ----------
+        if customer_ok[customer_id]:
+            stats = customers.get(customer_id)
+            if stats is None:
+                customers[customer_id] = [amount, 1, {product}]
+            else:
+                stats[0] += amount
+                stats[1] += 1
+                stats[2].add(product)
+
+        # ---------- Date ----------
+        if date_ok[date]:
+            stats = daily_totals.get(date)
+            if stats is None:
+                daily_totals[date] = [amount, 1]
+            else:
+                stats[0] += amount
+                stats[1] += 1
+
+            if customer_ok[customer_id]:
+                stats = daily.get(date)
+                if stats is None:
+                    members = new_day_customers()
+                    daily[date] = [amount, 1, members]
+                else:
+                    stats[0] += amount
+                    stats[1] += 1
+                    members = stats[2]
+                members.add(customer_id if exact_days else customer_values[customer_id])
+
+    # ---------- Decode category codes ----------
+    region_names = values["Region"]
+    product_names = values["ProductName"]
+    customer_ids = values["CustomerID"]
+    dates = values["Date"]
+
+    return {
+        "total_revenue": total_revenue,
+        "transaction_count": transaction_count,
+        "region_total": region_total,
+        "regions": {region_names[c]: stats for c, stats in regions.items()},
+        "products": {product_names[c]: stats for c, stats in products.items()},
+        "customers": {
+            customer_ids[c]: [spent, count, {product_names[p] for p in bought}]
+            for c, (spent, count, bought) in customers.items()
+        },
+        "daily": {
+            dates[c]: [revenue, count, {customer_ids[k] for k in seen} if exact_days else seen]
+            for c, (revenue, count, seen) in daily.items()
+        },
+        "daily_totals": {dates[c]: stats for c, stats in daily_totals.items()}
+    }
+
+# ---------- Memoized aggregation ----------
+# Raw aggregates of recently analyzed datasets, most recently used last.
+# Bounded by entry count and by the groups and set members they hold
+AGGREGATE_CACHE_SIZE = 8
+AGGREGATE_CACHE_MAX_ITEMS = 2_000_000
+FINGERPRINT_BATCH_ROWS = 4096  # records hashed per step, bounds the fingerprint's memory
+_aggregate_cache = OrderedDict()  # key -> (aggregates, size in items)
+_aggregate_cache_items = 0
+
+# Counters for the aggregate memo, see get_aggregate_cache_stats()
+aggregate_cache_stats = {
+    "hits": 0,          # group-by reused, only the final selection re-run
+    "misses": 0,        # aggregated and stored
+    "uncacheable": 0,   # no fingerprint given, aggregated without caching
+    "oversized": 0      # aggregated, too large to store
+}
+
+def dataset_fingerprint(transactions):
+    """
+    Content fingerprint of a list of transaction dictionaries or a
+    TransactionTable, to pass as the memo key (fingerprint=...)
+
+    Cheaper than aggregating but still a full pass, so compute it once
+    per dataset and reuse it across view calls: tables hash their
+    column buffers, lists hash every record's values at C speed in
+    batches of FINGERPRINT_BATCH_ROWS (about a fifth of the cost of
+    aggregate_transactions). Equal data always gives the same
+    fingerprint. Different data almost always gives a different one, but
+    list fingerprints are built from 64-bit hash() values, which can
+    collide (e.g. hash(-1) == hash(-2)).
+
+    Returns: str, or None for input that cannot be fingerprinted
+    (iterators, records with unhashable values)
+    """
+
+    if isinstance(transactions, TransactionTable):
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(transactions.quantities)
+        digest.update(transactions.unit_prices)
+        digest.update("\n".join(transactions.transaction_ids).encode("utf-8", "surrogatepass"))
+        for column in CATEGORICAL_COLUMNS:
+            digest.update(transactions.codes[column])
+            digest.update("\n".join(transactions.values[column]).encode("utf-8", "surrogatepass"))
+        return "table:" + digest.hexdigest()
+
+    if isinstance(transactions, (list, tuple)):
+        # Values in key order; records are assumed to share the same keys
+        field_names = tuple(transactions[0]) if transactions else ()
+        records = map(tuple, map(dict.values, transactions))
+        content = 0
         try:
-            region = t.get("Region")
-            quantity = t.get("Quantity", 0)
-            unit_price = t.get("UnitPrice", 0.0)
+            while True:
+                batch = tuple(islice(records, FINGERPRINT_BATCH_ROWS))
+                if not batch:
+                    break
+                content = hash((content, batch))
+        except TypeError:
+            return None
+        return f"list:{len(transactions)}:{hash(field_names)}:{content}"
+
+    return None
+
+@instrumented()
+def cached_aggregates(transactions, backend=None, approx_error=None, fingerprint=None):
+    """
+    aggregate_transactions memoized by a caller-supplied fingerprint
 
-            if not region or quantity <= 0 or unit_price <= 0:
-                continue
+    Only calls that pass a fingerprint are memoized (see
+    dataset_fingerprint, or use any key that identifies the data, e.g. a
+    source file signature); the data itself is never hashed here. With
+    the same fingerprint, calling several views, or the same view with a
+    different n/threshold, only re-runs the cheap selection step.
 
-            sale_amount = quantity * unit_price
-            total_sales_all_regions += sale_amount
+    At most AGGREGATE_CACHE_SIZE results holding AGGREGATE_CACHE_MAX_ITEMS
+    groups and set members in total are kept, least recently used
+    evicted first. The returned aggregates are shared with the cache
+    and must not be modified (e.g. by merge_aggregates).
 
-            if region not in region_stats:
-                region_stats[region] = {
-                    "total_sales": 0.0,
-                    "transaction_count": 0
-                }
+    Returns: dictionary of raw aggregates (see aggregate_transactions)
+    """
 
-            region_stats[region]["total_sales"] += sale_amount
-            region_stats[region]["transaction_count"] += 1
+    global _aggregate_cache_items
 
-        except (TypeError, ValueError):
-            continue
+    if fingerprint is None:
+        aggregate_cache_stats["uncacheable"] += 1
+        return aggregate_transactions(transactions, backend, approx_error)
 
-    # ---------- Calculate percentage contribution ----------
-    for region, stats in region_stats.items():
-        if total_sales_all_regions > 0:
-            stats["percentage"] = round(
-                (stats["total_sales"] / total_sales_all_regions) * 100, 2
-            )
-        else:
-            stats["percentage"] = 0.0
+    key = (fingerprint, backend or _default_backend, approx_error)
 
-    # ---------- Sort by total_sales (descending) ----------
-    sorted_region_stats = dict(
-        sorted(
-            region_stats.items(),
-            key=lambda item: item[1]["total_sales"],
-            reverse=True
+    entry = _aggregate_cache.get(key)
+    if entry is not None:
+        aggregate_cache_stats["hits"] += 1
+        _aggregate_cache.move_to_end(key)
+        return entry[0]
+
+    aggregates = aggregate_transactions(transactions, backend, approx_error)
+    size = aggregates_size(aggregates)
+    if size > AGGREGATE_CACHE_MAX_ITEMS:
+        aggregate_cache_stats["oversized"] += 1
+        return aggregates
+
+    aggregate_cache_stats["misses"] += 1
+    _aggregate_cache[key] = (aggregates, size)
+    _aggregate_cache_items += size
+    while len(_aggregate_cache) > AGGREGATE_CACHE_SIZE \
+            or _aggregate_cache_items > AGGREGATE_CACHE_MAX_ITEMS:
+        _, (_, evicted_size) = _aggregate_cache.popitem(last=False)
+        _aggregate_cache_items -= evicted_size
+
+    return aggregates
+
+def aggregates_size(aggregates):
+    """
+    Size of raw aggregates in items: groups plus the members of their
+    customer/product sets (a HyperLogLog sketch counts as one item)
+
+    Returns: int
+    """
+
+    size = sum(len(aggregates[key]) for key in ("regions", "products", "daily_totals"))
+    for key in ("customers", "daily"):
+        groups = aggregates[key]
+        size += len(groups)
+        size += sum(
+            len(members) if isinstance(members, set) else 1
+            for _, _, members in groups.values()
         )
-    )
+    return size
 
-    return sorted_region_stats
+def clear_aggregate_cache():
+    global _aggregate_cache_items
+    _aggregate_cache.clear()
+    _aggregate_cache_items = 0
 
-c. 
-def top_selling_products(transactions, n=5):
+def get_aggregate_cache_stats():
+    """
+    Returns: copy of the aggregate memo hit/miss counters
     """
-    Finds top n products by total quantity sold
 
-    Returns: list of tuples:
-    (ProductName, TotalQuantity, TotalRevenue)
+    return dict(aggregate_cache_stats)
+
+def merge_aggregates(target, other):
     """
+    Merges the raw aggregates of another batch of transactions into target
 
-    product_stats = {}
+    Sums and counts are added and the customer/product sets are unioned,
+    so aggregates computed over separate chunks of a file combine into
+    the aggregates of the whole file. Group order is first-seen order
+    across target then other.
 
-    # ---------- Aggregate quantity and revenue by product ----------
-    for t in transactions:
-        try:
-            product = t.get("ProductName")
-            quantity = t.get("Quantity", 0)
-            unit_price = t.get("UnitPrice", 0.0)
+    Returns: target (modified in place)
+    """
 
-            if not product or quantity <= 0 or unit_price <= 0:
-                continue
+    target["total_revenue"] += other["total_revenue"]
+    target["transaction_count"] += other["transaction_count"]
+    target["region_total"] += other["region_total"]
+
+    for key in ("regions", "products", "daily_totals"):
+        groups = target[key]
+        for name, (first, second) in other[key].items():
+            stats = groups.get(name)
+            if stats is None:
+                groups[name] = [first, second]
+            else:
+                stats[0] += first
+                stats[1] += second
+
+    for key in ("customers", "daily"):
+        groups = target[key]
+        for name, (amount, count, members) in other[key].items():
+            stats = groups.get(name)
+            if stats is None:
+                groups[name] = [amount, count, members.copy()]
+            else:
+                stats[0] += amount
+                stats[1] += count
+                stats[2] |= members
+
+    return target
+
+def aggregates_to_dict(aggregates):
+    """
+    Converts raw aggregates to a JSON-serializable dictionary
+    (sets become lists, HyperLogLog sketches become dictionaries)
 
-            revenue = quantity * unit_price
+    Returns: dictionary
+    """
 
-            if product not in product_stats:
-                product_stats[product] = {
-                    "total_quantity": 0,
-                    "total_revenue": 0.0
-                }
+    def members_to_json(members):
+        if isinstance(members, HyperLogLog):
+            return members.to_dict()
+        return list(members)
 
-            product_stats[product]["total_quantity"] += quantity
-            product_stats[product]["total_revenue"] += revenue
+    data = dict(aggregates)
+    for key in ("customers", "daily"):
+        data[key] = {
+            name: [amount, count, members_to_json(members)]
+            for name, (amount, count, members) in aggregates[key].items()
+        }
+    return data
 
-        except (TypeError, ValueError):
-            continue
+def aggregates_from_dict(data):
+    """
+    Rebuilds raw aggregates from the output of aggregates_to_dict
+
+    Returns: dictionary of raw aggregates
+    """
+
+    aggregates = aggregate_transactions([])
+    aggregates["total_revenue"] = data["total_revenue"]
+    aggregates["transaction_count"] = data["transaction_count"]
+    aggregates["region_total"] = data["region_total"]
+
+    for key in ("regions", "products", "daily_totals"):
+        aggregates[key] = {name: list(stats) for name, stats in data[key].items()}
+
+    def members_from_json(members):
+        if isinstance(members, dict):
+            return HyperLogLog.from_dict(members)
+        return set(members)
+
+    for key in ("customers", "daily"):
+        aggregates[key] = {
+            name: [amount, count, members_from_json(members)]
+            for name, (amount, count, members) in data[key].items()
+        }
+
+    return aggregates
+
+@instrumented()
+def analyze_sales(transactions, n=5, threshold=10, backend=None, approx_error=None,
+                  fingerprint=None):
+    """
+    Runs every analytics function over a single aggregation pass
+
+    approx_error enables approximate daily unique-customer counts (see
+    aggregate_transactions). The aggregates are memoized (see
+    cached_aggregates) only when a fingerprint for the data is given,
+    so a one-off call pays for no fingerprint pass.
+
+    Returns: dictionary with keys:
+    ['aggregates', 'total_revenue', 'region_stats', 'top_products',
+     'customer_stats', 'daily_stats', 'peak_day', 'low_products']
+    """
+
+    aggregates = cached_aggregates(transactions, backend, approx_error, fingerprint)
+    return analyze_aggregates(aggregates, n, threshold)
+
+@instrumented(rows=None)
+def analyze_aggregates(aggregates, n=5, threshold=10):
+    """
+    Builds every analytics result from already computed raw aggregates
+    (e.g. merged from several chunks)
+
+    Returns: same dictionary as analyze_sales, plus the raw aggregates
+    under 'aggregates'
+    """
+
+    return {
+        "aggregates": aggregates,
+        "total_revenue": calculate_total_revenue(None, aggregates),
+        "region_stats": region_wise_sales(None, aggregates),
+        "top_products": top_selling_products(None, n, aggregates),
+        "customer_stats": customer_analysis(None, aggregates),
+        "daily_stats": daily_sales_trend(None, aggregates),
+        "peak_day": find_peak_sales_day(None, aggregates),
+        "low_products": low_performing_products(None, threshold, aggregates)
+    }
+
+def select_top(items, n, key):
+    """
+    Selects the n largest items by key without sorting all of them
+
+    Same result and tie order as sorted(items, key=key, reverse=True)[:n]
+    but O(len(items) * log n) via a bounded heap.
+
+    Returns: list of items
+    """
+
+    if not isinstance(n, int) or n < 0:
+        # Keep slice semantics for unusual n
+        return sorted(items, key=key, reverse=True)[:n]
+
+    return heapq.nlargest(n, items, key=key)
+
+def top_products(aggregates, n=5, by="quantity"):
+    """
+    Top n products from raw aggregates, by total 'quantity' or 'revenue'
+
+    Returns: list of tuples:
+    (ProductName, TotalQuantity, TotalRevenue)
+    """
 
-    # ---------- Sort by total quantity (descending) ----------
-    sorted_products = sorted(
-        product_stats.items(),
-        key=lambda item: item[1]["total_quantity"],
-        reverse=True
+    position = {"quantity": 0, "revenue": 1}[by]
+
+    top_n = select_top(
+        aggregates["products"].items(),
+        n,
+        key=lambda item: item[1][position]
     )
 
-    # ---------- Return top n ----------
-    top_n = [
+    return [
         (
             product,
-            stats["total_quantity"],
-            round(stats["total_revenue"], 2)
+            total_quantity,
+            round(total_revenue, 2)
         )
-        for product, stats in sorted_products[:n]
+        for product, (total_quantity, total_revenue) in top_n
     ]
 
-    return top_n
+def top_customers(aggregates, n=5):
+    """
+    Top n customers from raw aggregates by their unrounded total spent
+    (the report's ranking); only the returned TotalSpent is rounded.
+    customer_analysis sorts by the rounded total instead, so customers
+    within half a paisa of each other can rank differently there.
 
-d. 
-def customer_analysis(transactions):
+    Returns: list of tuples:
+    (CustomerID, TotalSpent, PurchaseCount)
     """
-    Analyzes customer purchase patterns
 
-    Returns: dictionary of customer statistics sorted by total_spent descending
+    top_n = select_top(
+        aggregates["customers"].items(),
+        n,
+        key=lambda item: item[1][0]
+    )
+
+    return [
+        (customer_id, round(total_spent, 2), count)
+        for customer_id, (total_spent, count, _) in top_n
+    ]
+
+# The views below aggregate transactions themselves unless given
+# aggregates=...; fingerprint=... memoizes that step (see cached_aggregates)
+
+#Task 2.1
+# a.
+@instrumented()
+def calculate_total_revenue(transactions, aggregates=None, backend=None, fingerprint=None):
     """
+    Calculates total revenue from all transactions
 
-    customer_stats = {}
+    Returns: float (total revenue)
 
-    # ---------- Aggregate per customer ----------
-    for t in transactions:
-        try:
-            customer_id = t.get("CustomerID")
-            product = t.get("ProductName")
-            quantity = t.get("Quantity", 0)
-            unit_price = t.get("UnitPrice", 0.0)
+    Expected Output: Single number representing sum of (Quantity * UnitPrice)
+    Example: 1545000.50
+    """
 
-            if not customer_id or quantity <= 0 or unit_price <= 0:
-                continue
+    if aggregates is None:
+        aggregates = cached_aggregates(transactions, backend, fingerprint=fingerprint)
 
-            amount = quantity * unit_price
+    return aggregates["total_revenue"]
 
-            if customer_id not in customer_stats:
-                customer_stats[customer_id] = {
-                    "total_spent": 0.0,
-                    "purchase_count": 0,
-                    "products_bought": set()
-                }
+# b.
+@instrumented()
+def region_wise_sales(transactions, aggregates=None, backend=None, fingerprint=None):
+    """
+    Analyzes sales by region
 
-            customer_stats[customer_id]["total_spent"] += amount
-            customer_stats[customer_id]["purchase_count"] += 1
-            customer_stats[customer_id]["products_bought"].add(product)
+    Returns: dictionary with region statistics
+    """
 
-        except (TypeError, ValueError):
-            continue
+    if aggregates is None:
+        aggregates = cached_aggregates(transactions, backend, fingerprint=fingerprint)
 
-    # ---------- Final calculations ----------
-    for customer_id, stats in customer_stats.items():
-        if stats["purchase_count"] > 0:
-            stats["avg_order_value"] = round(
-                stats["total_spent"] / stats["purchase_count"], 2
-            )
+    total_sales_all_regions = aggregates["region_total"]
+    region_stats = {}
+
+    # ---------- Calculate percentage contribution ----------
+    for region, (total_sales, count) in aggregates["regions"].items():
+        if total_sales_all_regions > 0:
+            percentage = round((total_sales / total_sales_all_regions) * 100, 2)
         else:
-            stats["avg_order_value"] = 0.0
+            percentage = 0.0
+
+        region_stats[region] = {
+            "total_sales": total_sales,
+            "transaction_count": count,
+            "percentage": percentage
+        }
+
+    # ---------- Sort by total_sales (descending) ----------
+    sorted_region_stats = dict(
+        sorted(
+            region_stats.items(),
+            key=lambda item: item[1]["total_sales"],
+            reverse=True
+        )
+    )
+
+    return sorted_region_stats
+
+# c.
+@instrumented()
+def top_selling_products(transactions, n=5, aggregates=None, backend=None, fingerprint=None):
+    """
+    Finds top n products by total quantity sold
+
+    Returns: list of tuples:
+    (ProductName, TotalQuantity, TotalRevenue)
+    """
+
+    if aggregates is None:
+        aggregates = cached_aggregates(transactions, backend, fingerprint=fingerprint)
 
-        # Convert set to sorted list
-        stats["products_bought"] = sorted(stats["products_bought"])
+    return top_products(aggregates, n)
 
-        # Round total_spent
-        stats["total_spent"] = round(stats["total_spent"], 2)
+# d.
+@instrumented()
+def customer_analysis(transactions, aggregates=None, backend=None, fingerprint=None):
+    """
+    Analyzes customer purchase patterns
+
+    Returns: dictionary of customer statistics sorted by total_spent descending
+    """
+
+    if aggregates is None:
+        aggregates = cached_aggregates(transactions, backend, fingerprint=fingerprint)
+
+    customer_stats = {}
+
+    # ---------- Final calculations ----------
+    for customer_id, (total_spent, count, products) in aggregates["customers"].items():
+        customer_stats[customer_id] = {
+            "total_spent": round(total_spent, 2),
+            "purchase_count": count,
+            "products_bought": sorted(products),
+            "avg_order_value": round(total_spent / count, 2) if count > 0 else 0.0
+        }
 
     # ---------- Sort by total_spent (descending) ----------
     sorted_customers = dict(
@@ -199,47 +733,32 @@ def customer_analysis(transactions):
 
     return sorted_customers
 
-Task 2.2
-a.
-from collections import defaultdict
-
-def daily_sales_trend(transactions):
+#Task 2.2
+# a.
+@instrumented()
+def daily_sales_trend(transactions, aggregates=None, backend=None, approx_error=None,
+                      fingerprint=None):
     """
     Analyzes sales trends by date
 
     Returns: dictionary sorted by date
-    """
-
-    daily_stats = defaultdict(lambda: {
-        "revenue": 0.0,
-        "transaction_count": 0,
-        "unique_customers": set()
-    })
 
-    # ---------- Aggregate per day ----------
-    for t in transactions:
-        try:
-            date = t.get("Date")
-            customer_id = t.get("CustomerID")
-            quantity = t.get("Quantity", 0)
-            unit_price = t.get("UnitPrice", 0.0)
-
-            if not date or not customer_id or quantity <= 0 or unit_price <= 0:
-                continue
-
-            amount = quantity * unit_price
-
-            daily_stats[date]["revenue"] += amount
-            daily_stats[date]["transaction_count"] += 1
-            daily_stats[date]["unique_customers"].add(customer_id)
+    With approx_error (e.g. 0.01) unique_customers is estimated with a
+    fixed-size HyperLogLog sketch per day instead of an exact set.
+    """
 
-        except (TypeError, ValueError):
-            continue
+    if aggregates is None:
+        aggregates = cached_aggregates(transactions, backend, approx_error, fingerprint)
 
     # ---------- Finalize unique customer counts ----------
-    for date, stats in daily_stats.items():
-        stats["revenue"] = round(stats["revenue"], 2)
-        stats["unique_customers"] = len(stats["unique_customers"])
+    daily_stats = {
+        date: {
+            "revenue": round(revenue, 2),
+            "transaction_count": count,
+            "unique_customers": len(customers)
+        }
+        for date, (revenue, count, customers) in aggregates["daily"].items()
+    }
 
     # ---------- Sort chronologically ----------
     sorted_daily_stats = dict(
@@ -248,47 +767,28 @@ def daily_sales_trend(transactions):
 
     return sorted_daily_stats
 
-b.
-from collections import defaultdict
-
-def find_peak_sales_day(transactions):
+# b.
+@instrumented()
+def find_peak_sales_day(transactions, aggregates=None, backend=None, fingerprint=None):
     """
     Identifies the date with highest revenue
 
     Returns: tuple (date, revenue, transaction_count)
     """
 
-    daily_totals = defaultdict(lambda: {
-        "revenue": 0.0,
-        "transaction_count": 0
-    })
-
-    # ---------- Aggregate revenue per day ----------
-    for t in transactions:
-        try:
-            date = t.get("Date")
-            quantity = t.get("Quantity", 0)
-            unit_price = t.get("UnitPrice", 0.0)
-
-            if not date or quantity <= 0 or unit_price <= 0:
-                continue
-
-            daily_totals[date]["revenue"] += quantity * unit_price
-            daily_totals[date]["transaction_count"] += 1
-
-        except (TypeError, ValueError):
-            continue
+    if aggregates is None:
+        aggregates = cached_aggregates(transactions, backend, fingerprint=fingerprint)
 
     # ---------- Find peak day ----------
     peak_date = None
     peak_revenue = 0.0
     peak_txn_count = 0
 
-    for date, stats in daily_totals.items():
-        if stats["revenue"] > peak_revenue:
-            peak_revenue = stats["revenue"]
+    for date, (revenue, count) in aggregates["daily_totals"].items():
+        if revenue > peak_revenue:
+            peak_revenue = revenue
             peak_date = date
-            peak_txn_count = stats["transaction_count"]
+            peak_txn_count = count
 
     return (
         peak_date,
@@ -296,9 +796,11 @@ def find_peak_sales_day(transactions):
         peak_txn_count
     )
 
-Task 2.3
-a.
-def low_performing_products(transactions, threshold=10):
+#Task 2.3
+# a.
+@instrumented()
+def low_performing_products(transactions, threshold=10, aggregates=None, backend=None,
+                            fingerprint=None):
     """
     Identifies products with low sales
 
@@ -306,41 +808,18 @@ def low_performing_products(transactions, threshold=10):
     (ProductName, TotalQuantity, TotalRevenue)
     """
 
-    product_stats = {}
-
-    # ---------- Aggregate quantity and revenue by product ----------
-    for t in transactions:
-        try:
-            product = t.get("ProductName")
-            quantity = t.get("Quantity", 0)
-            unit_price = t.get("UnitPrice", 0.0)
-
-            if not product or quantity <= 0 or unit_price <= 0:
-                continue
-
-            revenue = quantity * unit_price
-
-            if product not in product_stats:
-                product_stats[product] = {
-                    "total_quantity": 0,
-                    "total_revenue": 0.0
-                }
-
-            product_stats[product]["total_quantity"] += quantity
-            product_stats[product]["total_revenue"] += revenue
-
-        except (TypeError, ValueError):
-            continue
+    if aggregates is None:
+        aggregates = cached_aggregates(transactions, backend, fingerprint=fingerprint)
 
     # ---------- Filter low-performing products ----------
     low_products = [
         (
             product,
-            stats["total_quantity"],
-            round(stats["total_revenue"], 2)
+            total_quantity,
+            round(total_revenue, 2)
         )
-        for product, stats in product_stats.items()
-        if stats["total_quantity"] < threshold
+        for product, (total_quantity, total_revenue) in aggregates["products"].items()
+        if total_quantity < threshold
     ]
 
     # ---------- Sort by TotalQuantity ascending ----------
@@ -350,6 +829,3 @@ def low_performing_products(transactions, threshold=10):
     )
 
     return low_products_sorted
-
-
-
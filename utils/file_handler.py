@@ -1,6 +1,20 @@
 #Task 1.1
-
-def read_sales_data (filename):
+import codecs
+import os
+from itertools import islice
+
+from utils.transaction_table import TransactionTable, TRANSACTION_FIELDS
+from utils.transaction_index import TransactionIndex
+from utils.numpy_backend import amount_ranges_numpy, numpy_available
+from utils.instrumentation import instrumented, rows_from_result
+
+ENCODINGS_TO_TRY = ["utf-8", "latin-1", "cp1252"]
+ENCODING_SAMPLE_SIZE = 64 * 1024
+# Candidates that decode any byte sequence, so a sample decides for the whole file
+ENCODINGS_DECODING_ANY_BYTES = ["latin-1"]
+
+@instrumented(rows=rows_from_result)
+def read_sales_data (filename, read_info=None):
     """
     Reads sales data from file handling encoding issues
 
@@ -15,133 +29,512 @@ def read_sales_data (filename):
     - Handle FileNotFoundError with appropriate error message
     - Skip the header row
     - Remove empty lines
+
+    The file is decoded once with the encoding detect_encoding picks
+    from a sample; only if a later byte fails does the whole read
+    restart with the next candidate, so all lines share one encoding.
+
+    Parameters:
+    - read_info: optional dict, updated with:
+      {'detected_encoding': str, 'encoding': str, 'fallback': bool}
+      (fallback: the sampled encoding failed later in the file)
     """
 
-    encodings_to_try = ["utf-8", "latin-1", "cp1252"]
+    try:
+        detected = detect_encoding(filename)
+    except FileNotFoundError:
+        print(f"Error: File '{filename}' not found.")
+        return []
 
-    for encoding in encodings_to_try:
+    for encoding in candidate_encodings(detected):
         try:
             with open(filename, "r", encoding=encoding) as file:
-                lines = file.readlines()
-
-            # Skip header and remove empty lines
-            cleaned_lines = [
-                line.strip()
-                for line in lines[1:]
-                if line.strip()
-            ]
-
-            return cleaned_lines
-
+                # Skip header
+                next(file, None)
+                # Remove empty lines
+                cleaned_lines = [line for line in map(str.strip, file) if line]
         except UnicodeDecodeError:
             # Try next encoding
             continue
 
-        except FileNotFoundError:
-            print(f"Error: File '{filename}' not found.")
-            return []
+        if read_info is not None:
+            read_info.update({
+                "detected_encoding": detected,
+                "encoding": encoding,
+                "fallback": encoding != detected
+            })
+        return cleaned_lines
 
     # If no encoding worked
     print("Error: Unable to read file due to encoding issues.")
     return []
 
+def detect_encoding(filename, sample_size=ENCODING_SAMPLE_SIZE):
+    """
+    Picks the first candidate encoding that decodes a sample of the file
+
+    Only the first sample_size bytes are read, so a large file is not
+    decoded once per candidate encoding.
+
+    Returns: encoding name (str)
+    """
+
+    with open(filename, "rb") as file:
+        sample = file.read(sample_size)
+
+    # final=False tolerates a multi-byte character cut at the sample end;
+    # a sample shorter than sample_size is the whole file
+    final = len(sample) < sample_size
+
+    for encoding in ENCODINGS_TO_TRY:
+        decoder = codecs.getincrementaldecoder(encoding)()
+        try:
+            decoder.decode(sample, final=final)
+            return encoding
+        except UnicodeDecodeError:
+            continue
+
+def candidate_encodings(detected):
+    """
+    Returns: the encodings to try, in order, starting with the detected one
+    """
+
+    return ENCODINGS_TO_TRY[ENCODINGS_TO_TRY.index(detected):]
+
+def encoding_is_certain(filename, detected, sample_size=ENCODING_SAMPLE_SIZE):
+    """
+    Whether detect_encoding's sample already proves the whole file
+    decodes: the sample was the whole file, or the encoding decodes
+    any bytes
+
+    Returns: bool
+    """
+
+    return detected in ENCODINGS_DECODING_ANY_BYTES or os.path.getsize(filename) < sample_size
+
+    return ENCODINGS_TO_TRY[-1]
+
+def file_decodes(filename, encoding, start=0, end=None, block_size=ENCODING_SAMPLE_SIZE * 16):
+    """
+    Checks that bytes [start, end) of the file decode with encoding,
+    reading in bounded blocks
+
+    Returns: bool
+    """
+
+    decoder = codecs.getincrementaldecoder(encoding)()
+
+    with open(filename, "rb") as file:
+        file.seek(start)
+        remaining = None if end is None else max(end - start, 0)
+
+        try:
+            while remaining is None or remaining > 0:
+                block = file.read(block_size if remaining is None else min(block_size, remaining))
+                if not block:
+                    break
+                if remaining is not None:
+                    remaining -= len(block)
+                decoder.decode(block, final=False)
+            decoder.decode(b"", final=True)
+        except UnicodeDecodeError:
+            return False
+
+    return True
+
+def resolve_encoding(filename, detected=None):
+    """
+    Picks the first candidate encoding that decodes the whole file
+
+    detect_encoding rules candidates out on a bounded sample; unless
+    that is already certain (see encoding_is_certain) the chosen one is
+    confirmed over the rest of the file with a binary decode pass. A
+    byte that fails late in the file moves the whole file to the next
+    candidate, the same policy as read_sales_data's restart, so
+    identical bytes always decode to identical strings. Only
+    iter_sales_data needs this pass, as it cannot restart once lines
+    have been yielded; the list and process-pool readers retry instead.
+
+    Parameters:
+    - detected: result of detect_encoding, if already known
+
+    Returns: encoding name (str)
+    """
+
+    detected = detected or detect_encoding(filename)
+    if encoding_is_certain(filename, detected):
+        return detected
+
+    for encoding in candidate_encodings(detected):
+        if file_decodes(filename, encoding):
+            return encoding
+
+    return ENCODINGS_TO_TRY[-1]
+
+def iter_sales_data(filename, read_info=None):
+    """
+    Streams cleaned lines from the sales file one at a time
+
+    Same rules as read_sales_data (header skipped, empty lines removed)
+    but only the current line is held in memory, so multi-GB files can
+    be consumed lazily. The file is decoded with a single encoding
+    chosen by resolve_encoding.
+
+    Parameters:
+    - read_info: optional dict, updated with:
+      {'detected_encoding': str, 'encoding': str, 'fallback': bool}
+      (fallback: the sampled encoding failed later in the file)
+
+    Yields: raw line strings
+    """
+
+    try:
+        detected = detect_encoding(filename)
+        encoding = resolve_encoding(filename, detected)
+    except FileNotFoundError:
+        print(f"Error: File '{filename}' not found.")
+        return
+
+    if read_info is not None:
+        read_info.update({
+            "detected_encoding": detected,
+            "encoding": encoding,
+            "fallback": encoding != detected
+        })
+
+    try:
+        with open(filename, "r", encoding=encoding) as file:
+            # Skip header
+            next(file, None)
+
+            for line in file:
+                # Remove empty lines
+                line = line.strip()
+                if line:
+                    yield line
+
+    except FileNotFoundError:
+        print(f"Error: File '{filename}' not found.")
+
+    except UnicodeDecodeError:
+        # Only if the file changed after its encoding was resolved
+        print("Error: Unable to read file due to encoding issues.")
+
 #Task 1.2  
-def parse_transactions(raw_lines):
+@instrumented(rejects=lambda args, kwargs, result: {"unparseable": len(args[0]) - len(result)})
+def parse_transactions(raw_lines, columnar=False):
     """
     Parses raw lines into clean list of dictionaries
 
     Returns: list of dictionaries with keys:
     ['TransactionID', 'Date', 'ProductID', 'ProductName',
      'Quantity', 'UnitPrice', 'CustomerID', 'Region']
+
+    With columnar=True a TransactionTable is returned instead, which
+    holds the same records in typed, dictionary-encoded columns.
     """
 
-    parsed_records = []
+    if not columnar:
+        return list(iter_transactions(raw_lines))
 
-    for line in raw_lines:
-        # Split by pipe delimiter
-        parts = line.split("|")
+    table = TransactionTable()
+    rows = iter_transaction_rows(raw_lines)
+    while True:
+        batch = list(islice(rows, PARSE_BATCH_SIZE))
+        if not batch:
+            break
+        try:
+            table.extend_rows(batch)
+        except OverflowError:
+            # Quantity too large for the integer column: add row by row
+            # and skip the rows that do not fit
+            for row in batch:
+                try:
+                    table.append(dict(zip(TRANSACTION_FIELDS, row)))
+                except OverflowError:
+                    continue
+
+    return table
+
+# Rows appended to a TransactionTable per extend_rows call
+PARSE_BATCH_SIZE = 4096
+
+def iter_transactions(raw_lines):
+    """
+    Lazily parses raw lines into transaction dictionaries
 
-        # Skip rows with incorrect number of fields
-        if len(parts) != 8:
-            continue
+    Accepts any iterable of lines (e.g. iter_sales_data) and yields one
+    record at a time with the same cleaning rules as parse_transactions.
 
-        try:
-            transaction_id = parts[0].strip()
-            date = parts[1].strip()
-            product_id = parts[2].strip()
+    Yields: transaction dictionaries
+    """
 
-            # Clean ProductName (remove commas)
-            product_name = parts[3].replace(",", "").strip()
+    return _parse_lines(raw_lines, as_dicts=True)
 
-            # Clean and convert Quantity
-            quantity_str = parts[4].replace(",", "").strip()
-            quantity = int(quantity_str)
+def iter_transaction_rows(raw_lines):
+    """
+    Same as iter_transactions but yields plain tuples in
+    TRANSACTION_FIELDS order, without building a dictionary per row
 
-            # Clean and convert UnitPrice
-            unit_price_str = parts[5].replace(",", "").strip()
-            unit_price = float(unit_price_str)
+    Yields: (TransactionID, Date, ProductID, ProductName, Quantity,
+    UnitPrice, CustomerID, Region) tuples
+    """
 
-            customer_id = parts[6].strip()
-            region = parts[7].strip()
+    return _parse_lines(raw_lines, as_dicts=False)
 
-            record = {
-                "TransactionID": transaction_id,
-                "Date": date,
-                "ProductID": product_id,
-                "ProductName": product_name,
-                "Quantity": quantity,
-                "UnitPrice": unit_price,
-                "CustomerID": customer_id,
-                "Region": region
-            }
+def _parse_lines(raw_lines, as_dicts):
+    """
+    Parser shared by iter_transactions and iter_transaction_rows
+
+    Rules: a line must have exactly 8 "|"-separated fields; every field
+    is stripped, commas are removed from ProductName, Quantity and
+    UnitPrice, Quantity must convert with int() and UnitPrice with
+    float(); other lines are skipped.
 
-            parsed_records.append(record)
+    int()/float() already ignore surrounding whitespace (apart from a few
+    control characters), so numbers are only stripped when converting
+    the raw field fails, and replace() only runs on fields that contain
+    a comma; the results are the same with less work per row.
+    """
 
-        except (ValueError, IndexError):
-            # Skip records with conversion or parsing issues
+    for line in raw_lines:
+        # Split by pipe delimiter; skip rows with incorrect number of fields
+        try:
+            (transaction_id, date, product_id, product_name,
+             quantity, unit_price, customer_id, region) = line.split("|")
+        except ValueError:
             continue
 
-    return parsed_records
+        # Clean and convert Quantity and UnitPrice
+        if "," in quantity:
+            quantity = quantity.replace(",", "")
+        try:
+            quantity = int(quantity)
+        except ValueError:
+            try:
+                quantity = int(quantity.strip())
+            except ValueError:
+                continue
+
+        if "," in unit_price:
+            unit_price = unit_price.replace(",", "")
+        try:
+            unit_price = float(unit_price)
+        except ValueError:
+            try:
+                unit_price = float(unit_price.strip())
+            except ValueError:
+                continue
+
+        # Clean ProductName (remove commas)
+        if "," in product_name:
+            product_name = product_name.replace(",", "")
+
+        if as_dicts:
+            yield {
+                "TransactionID": transaction_id.strip(),
+                "Date": date.strip(),
+                "ProductID": product_id.strip(),
+                "ProductName": product_name.strip(),
+                "Quantity": quantity,
+                "UnitPrice": unit_price,
+                "CustomerID": customer_id.strip(),
+                "Region": region.strip()
+            }
+        else:
+            yield (
+                transaction_id.strip(), date.strip(), product_id.strip(), product_name.strip(),
+                quantity, unit_price, customer_id.strip(), region.strip()
+            )
 
 #Task 1.3: 
+@instrumented(
+    rows=lambda args, kwargs, result: result[2]["total_input"],
+    rejects=lambda args, kwargs, result: {
+        reason: result[2][reason] for reason in ("invalid", "filtered_by_region", "filtered_by_amount")
+    }
+)
 def validate_and_filter(transactions, region=None, min_amount=None, max_amount=None):
     """
     Validates transactions and applies optional filters
 
     Returns:
     (valid_transactions, invalid_count, filter_summary)
+
+    A TransactionTable input is validated column-wise and the valid rows
+    are returned as a TransactionTable. A TransactionIndex (see
+    build_transaction_index) answers the filters from its indexes
+    without rescanning the rows.
     """
 
-    valid_transactions = []
-    invalid_count = 0
+    if isinstance(transactions, TransactionIndex):
+        return _validate_and_filter_index(transactions, region, min_amount, max_amount)
+
+    if isinstance(transactions, TransactionTable):
+        return _validate_and_filter_table(transactions, region, min_amount, max_amount)
+
+    # ---------- Single pass: input info, validation and filters ----------
+    filter_summary = {}
+    input_info = {}
+    filtered_transactions = list(iter_valid_transactions(
+        transactions,
+        region=region,
+        min_amount=min_amount,
+        max_amount=max_amount,
+        filter_summary=filter_summary,
+        input_info=input_info
+    ))
+
+    _print_filter_info(input_info, filter_summary, region, min_amount, max_amount)
+
+    return filtered_transactions, filter_summary["invalid"], filter_summary
+
+@instrumented(rejects=lambda args, kwargs, result: {"invalid": result.invalid_count})
+def build_transaction_index(transactions):
+    """
+    Validates transactions once and indexes the valid rows for
+    repeated filtering
+
+    Accepts a list of transaction dictionaries or a TransactionTable.
+    Passing the index to validate_and_filter gives the same results as
+    passing the transactions themselves.
+
+    Returns: TransactionIndex
+    """
+
+    if isinstance(transactions, TransactionTable):
+        input_info = _table_input_info(transactions)
+        valid_positions, _ = _scan_table(transactions)
+        return TransactionIndex(transactions, valid_positions, len(transactions), input_info)
+
+    input_info = {}
+    valid_positions = []
+    current = [0]
+
+    def numbered():
+        for position, t in enumerate(transactions):
+            current[0] = position
+            yield t
+
+    # iter_valid_transactions yields each valid row as soon as it reads it,
+    # so current holds that row's position
+    for _ in iter_valid_transactions(numbered(), input_info=input_info):
+        valid_positions.append(current[0])
+
+    return TransactionIndex(transactions, valid_positions, len(transactions), input_info)
+
+def _validate_and_filter_index(index, region=None, min_amount=None, max_amount=None):
+    """
+    validate_and_filter for a TransactionIndex
+
+    Returns:
+    (valid_transactions, invalid_count, filter_summary)
+    """
+
+    valid_count = len(index)
+    after_region = index.count(region=region)
+    kept = index.positions(region=region, min_amount=min_amount, max_amount=max_amount)
+
+    filter_summary = {
+        "total_input": index.total_input,
+        "invalid": index.invalid_count,
+        "filtered_by_region": valid_count - after_region,
+        "filtered_by_amount": after_region - len(kept),
+        "final_count": len(kept)
+    }
+
+    _print_filter_info(index.input_info, filter_summary, region, min_amount, max_amount)
+
+    return index.rows(kept), index.invalid_count, filter_summary
+
+def _print_filter_info(input_info, filter_summary, region, min_amount, max_amount):
+    """
+    Prints the input info and per-filter counts reported by validate_and_filter
+    """
 
     # ---------- Pre-validation info ----------
-    available_regions = sorted(
-        {t.get("Region") for t in transactions if t.get("Region")}
-    )
+    if input_info["amount_range"] is not None:
+        min_seen, max_seen = input_info["amount_range"]
+        print(f"Available Regions: {input_info['available_regions']}")
+        print(f"Transaction Amount Range: {min_seen} - {max_seen}")
 
-    amounts = [
-        t["Quantity"] * t["UnitPrice"]
-        for t in transactions
-        if isinstance(t.get("Quantity"), int)
-        and isinstance(t.get("UnitPrice"), (int, float))
-        and t["Quantity"] > 0
-        and t["UnitPrice"] > 0
+    # ---------- Filtering ----------
+    if region:
+        after_region = filter_summary["final_count"] + filter_summary["filtered_by_amount"]
+        print(f"Records after region filter ({region}): {after_region}")
+
+    if min_amount is not None or max_amount is not None:
+        print(f"Records after amount filter: {filter_summary['final_count']}")
+
+def iter_valid_transactions(transactions, region=None, min_amount=None,
+                            max_amount=None, filter_summary=None, input_info=None):
+    """
+    Lazily validates and filters transactions
+
+    Applies the same validation rules and region/amount filters as
+    validate_and_filter one record at a time, so it can sit between
+    iter_transactions and the aggregation engine without materializing
+    the file.
+
+    Parameters:
+    - filter_summary: optional dict, filled with the same counts as
+      validate_and_filter's filter_summary once the stream is exhausted
+    - input_info: optional dict, filled once the stream is exhausted with
+      what validate_and_filter prints about the input (before validation):
+      {'available_regions': sorted list,
+       'amount_range': (min, max) over rows with positive int Quantity and
+       positive UnitPrice, or None if there are none,
+       'raw_amount_range': (min, max) over every row with a numeric
+       Quantity and UnitPrice, invalid ones included, or None}
+
+    Yields: valid transaction dictionaries
+    """
+
+    required_fields = [
+        "TransactionID", "Date", "ProductID", "ProductName",
+        "Quantity", "UnitPrice", "CustomerID", "Region"
     ]
 
-    if amounts:
-        print(f"Available Regions: {available_regions}")
-        print(f"Transaction Amount Range: {min(amounts)} - {max(amounts)}")
+    total_input = 0
+    invalid_count = 0
+    filtered_by_region = 0
+    filtered_by_amount = 0
+    final_count = 0
+
+    available_regions = set()
+    min_seen = max_seen = None
+    raw_min = raw_max = None
 
-    # ---------- Validation ----------
     for t in transactions:
+        total_input += 1
+
+        # ---------- Input info ----------
+        if input_info is not None:
+            if t.get("Region"):
+                available_regions.add(t["Region"])
+
+            quantity = t.get("Quantity")
+            unit_price = t.get("UnitPrice")
+            if isinstance(quantity, int) and isinstance(unit_price, (int, float)):
+                amount = quantity * unit_price
+
+                if raw_min is None:
+                    raw_min = raw_max = amount
+                elif amount < raw_min:
+                    raw_min = amount
+                elif amount > raw_max:
+                    raw_max = amount
+
+                if quantity > 0 and unit_price > 0:
+                    if min_seen is None:
+                        min_seen = max_seen = amount
+                    elif amount < min_seen:
+                        min_seen = amount
+                    elif amount > max_seen:
+                        max_seen = amount
+
+        # ---------- Validation ----------
         try:
-            # Required fields
-            required_fields = [
-                "TransactionID", "Date", "ProductID", "ProductName",
-                "Quantity", "UnitPrice", "CustomerID", "Region"
-            ]
-
             if not all(field in t and t[field] for field in required_fields):
                 raise ValueError
 
@@ -157,49 +550,258 @@ def validate_and_filter(transactions, region=None, min_amount=None, max_amount=N
             if t["Quantity"] <= 0 or t["UnitPrice"] <= 0:
                 raise ValueError
 
-            valid_transactions.append(t)
-
         except Exception:
             invalid_count += 1
+            continue
 
-    # ---------- Filtering ----------
+        # ---------- Filtering ----------
+        if region and t["Region"] != region:
+            filtered_by_region += 1
+            continue
+
+        if min_amount is not None or max_amount is not None:
+            amount = t["Quantity"] * t["UnitPrice"]
+            if (min_amount is not None and amount < min_amount) or \
+                    (max_amount is not None and amount > max_amount):
+                filtered_by_amount += 1
+                continue
+
+        final_count += 1
+        yield t
+
+    # ---------- Summary ----------
+    if filter_summary is not None:
+        filter_summary.update({
+            "total_input": total_input,
+            "invalid": invalid_count,
+            "filtered_by_region": filtered_by_region,
+            "filtered_by_amount": filtered_by_amount,
+            "final_count": final_count
+        })
+
+    if input_info is not None:
+        input_info.update({
+            "available_regions": sorted(available_regions),
+            "amount_range": (min_seen, max_seen) if min_seen is not None else None,
+            "raw_amount_range": (raw_min, raw_max) if raw_min is not None else None
+        })
+
+def iter_filtered_transactions(raw_lines, region=None, min_amount=None,
+                               max_amount=None, filter_summary=None):
+    """
+    Parses, validates and filters raw lines in one streaming pass
+
+    Same result and filter_summary as
+    iter_valid_transactions(iter_transactions(raw_lines), ...), but the
+    validation rules and region/amount predicates run on the parsed
+    tuples, so only the rows that are kept become dictionaries.
+
+    Yields: valid transaction dictionaries
+    """
+
+    total_input = 0
+    invalid_count = 0
     filtered_by_region = 0
     filtered_by_amount = 0
+    final_count = 0
 
-    filtered_transactions = valid_transactions
+    check_amount = min_amount is not None or max_amount is not None
 
-    if region:
-        before = len(filtered_transactions)
-        filtered_transactions = [
-            t for t in filtered_transactions if t["Region"] == region
-        ]
-        filtered_by_region = before - len(filtered_transactions)
-        print(f"Records after region filter ({region}): {len(filtered_transactions)}")
+    for row in iter_transaction_rows(raw_lines):
+        total_input += 1
+        (transaction_id, date, product_id, product_name,
+         quantity, unit_price, customer_id, row_region) = row
 
-    if min_amount is not None or max_amount is not None:
-        before = len(filtered_transactions)
+        # ---------- Validation ----------
+        if not (transaction_id.startswith("T") and product_id.startswith("P")
+                and customer_id.startswith("C") and date and product_name and row_region
+                and quantity and unit_price) \
+                or quantity <= 0 or unit_price <= 0:
+            invalid_count += 1
+            continue
 
-        def amount_in_range(t):
-            amount = t["Quantity"] * t["UnitPrice"]
-            if min_amount is not None and amount < min_amount:
-                return False
-            if max_amount is not None and amount > max_amount:
-                return False
-            return True
-
-        filtered_transactions = [
-            t for t in filtered_transactions if amount_in_range(t)
-        ]
-        filtered_by_amount = before - len(filtered_transactions)
-        print(f"Records after amount filter: {len(filtered_transactions)}")
+        # ---------- Filtering ----------
+        if region and row_region != region:
+            filtered_by_region += 1
+            continue
+
+        if check_amount:
+            amount = quantity * unit_price
+            if (min_amount is not None and amount < min_amount) or \
+                    (max_amount is not None and amount > max_amount):
+                filtered_by_amount += 1
+                continue
+
+        final_count += 1
+        yield {
+            "TransactionID": transaction_id,
+            "Date": date,
+            "ProductID": product_id,
+            "ProductName": product_name,
+            "Quantity": quantity,
+            "UnitPrice": unit_price,
+            "CustomerID": customer_id,
+            "Region": row_region
+        }
 
     # ---------- Summary ----------
+    if filter_summary is not None:
+        filter_summary.update({
+            "total_input": total_input,
+            "invalid": invalid_count,
+            "filtered_by_region": filtered_by_region,
+            "filtered_by_amount": filtered_by_amount,
+            "final_count": final_count
+        })
+
+def _validate_and_filter_table(table, region=None, min_amount=None, max_amount=None):
+    """
+    validate_and_filter for a TransactionTable
+
+    Returns:
+    (valid_table, invalid_count, filter_summary)
+    """
+
+    kept, counts = _scan_table(table, region, min_amount, max_amount)
+
     filter_summary = {
-        "total_input": len(transactions),
+        "total_input": len(table),
+        "invalid": counts["invalid"],
+        "filtered_by_region": counts["filtered_by_region"],
+        "filtered_by_amount": counts["filtered_by_amount"],
+        "final_count": len(kept)
+    }
+
+    _print_filter_info(_table_input_info(table), filter_summary, region, min_amount, max_amount)
+
+    return table.take(kept), counts["invalid"], filter_summary
+
+def _table_input_info(table):
+    """
+    Returns: the input_info of iter_valid_transactions for a TransactionTable
+    """
+
+    values = table.values
+    codes = table.codes
+
+    available_regions = sorted(
+        {values["Region"][code] for code in set(codes["Region"])} - {""}
+    )
+
+    if numpy_available():
+        raw_amount_range, amount_range = amount_ranges_numpy(table)
+    else:
+        raw_amount_range, amount_range = _amount_ranges(table)
+
+    return {
+        "available_regions": available_regions,
+        "amount_range": amount_range,
+        "raw_amount_range": raw_amount_range
+    }
+
+def _amount_ranges(table):
+    """
+    Min and max of Quantity * UnitPrice in one pass over the table's
+    array columns, without building a list of amounts
+
+    Returns: (raw_range, positive_range), each (min, max) or None (see
+    amount_ranges_numpy)
+    """
+
+    raw_min = raw_max = min_seen = max_seen = None
+
+    for quantity, unit_price in zip(table.quantities, table.unit_prices):
+        amount = quantity * unit_price
+        if amount != amount:
+            # NaN
+            continue
+
+        if raw_min is None:
+            raw_min = raw_max = amount
+        elif amount < raw_min:
+            raw_min = amount
+        elif amount > raw_max:
+            raw_max = amount
+
+        if quantity > 0 and unit_price > 0:
+            if min_seen is None:
+                min_seen = max_seen = amount
+            elif amount < min_seen:
+                min_seen = amount
+            elif amount > max_seen:
+                max_seen = amount
+
+    return (
+        (raw_min, raw_max) if raw_min is not None else None,
+        (min_seen, max_seen) if min_seen is not None else None
+    )
+
+def _scan_table(table, region=None, min_amount=None, max_amount=None):
+    """
+    Validates and filters a TransactionTable in a single pass
+
+    Prefix and non-empty checks run once per distinct category value
+    rather than once per row.
+
+    Returns: (kept row indices, {'invalid': int, 'filtered_by_region': int,
+    'filtered_by_amount': int})
+    """
+
+    values = table.values
+    codes = table.codes
+
+    # ---------- Validation rules per category value ----------
+    prefixes = {"ProductID": "P", "CustomerID": "C"}
+    code_ok = {
+        column: [bool(v) and v.startswith(prefixes.get(column, "")) for v in column_values]
+        for column, column_values in values.items()
+    }
+
+    region_code = table._lookup["Region"].get(region) if region else None
+
+    # ---------- Single pass over the rows ----------
+    invalid_count = 0
+    filtered_by_region = 0
+    filtered_by_amount = 0
+    kept = []
+
+    rows = zip(
+        table.transaction_ids, table.quantities, table.unit_prices,
+        codes["Date"], codes["ProductID"], codes["ProductName"],
+        codes["CustomerID"], codes["Region"]
+    )
+
+    date_ok = code_ok["Date"]
+    product_id_ok = code_ok["ProductID"]
+    product_name_ok = code_ok["ProductName"]
+    customer_ok = code_ok["CustomerID"]
+    region_ok = code_ok["Region"]
+
+    for i, (tid, q, p, d, pid, pname, cid, r) in enumerate(rows):
+        # q/p <= 0 (rather than > 0) so a NaN UnitPrice is valid, as for dicts
+        if not (tid.startswith("T") and q and p
+                and date_ok[d] and product_id_ok[pid] and product_name_ok[pname]
+                and customer_ok[cid] and region_ok[r]) or q <= 0 or p <= 0:
+            invalid_count += 1
+            continue
+
+        if region and r != region_code:
+            filtered_by_region += 1
+            continue
+
+        if min_amount is not None or max_amount is not None:
+            amount = q * p
+            if (min_amount is not None and amount < min_amount) or \
+                    (max_amount is not None and amount > max_amount):
+                filtered_by_amount += 1
+                continue
+
+        kept.append(i)
+
+    counts = {
         "invalid": invalid_count,
         "filtered_by_region": filtered_by_region,
-        "filtered_by_amount": filtered_by_amount,
-        "final_count": len(filtered_transactions)
+        "filtered_by_amount": filtered_by_amount
     }
 
-    return filtered_transactions, invalid_count, filter_summary
+    return kept, counts
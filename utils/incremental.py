@@ -0,0 +1,217 @@
+import hashlib
+import json
+import os
+
+from utils.file_handler import detect_encoding, candidate_encodings
+from utils.data_processor import (
+    aggregate_transactions,
+    merge_aggregates,
+    aggregates_to_dict,
+    aggregates_from_dict,
+    analyze_aggregates
+)
+from utils.parallel import process_chunk
+
+CHECKPOINT_VERSION = 1
+
+# Bytes hashed at the start of the file and just before the checkpoint
+# offset to detect a rewritten (rather than appended) source file
+FINGERPRINT_BYTES = 64 * 1024
+
+def default_checkpoint_file(filename):
+    return filename + ".checkpoint.json"
+
+def file_fingerprint(filename, offset):
+    """
+    Hashes the first and last FINGERPRINT_BYTES of the first offset bytes
+
+    Returns: hex digest (str)
+    """
+
+    digest = hashlib.sha256()
+
+    with open(filename, "rb") as file:
+        digest.update(file.read(min(offset, FINGERPRINT_BYTES)))
+        tail_start = max(0, offset - FINGERPRINT_BYTES)
+        file.seek(tail_start)
+        digest.update(file.read(offset - tail_start))
+
+    return digest.hexdigest()
+
+def load_checkpoint(checkpoint_file):
+    """
+    Returns: checkpoint dictionary, or None if missing/unreadable
+    """
+
+    try:
+        with open(checkpoint_file, "r", encoding="utf-8") as f:
+            checkpoint = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if not isinstance(checkpoint, dict) or checkpoint.get("version") != CHECKPOINT_VERSION:
+        return None
+
+    return checkpoint
+
+def save_checkpoint(checkpoint_file, checkpoint):
+    """
+    Writes the checkpoint atomically (temp file + rename)
+    """
+
+    temp_file = checkpoint_file + ".tmp"
+    with open(temp_file, "w", encoding="utf-8") as f:
+        # dumps uses the C encoder; dump(obj, f) encodes in pure Python
+        f.write(json.dumps(checkpoint))
+    os.replace(temp_file, checkpoint_file)
+
+def _committed_end(filename, start, size):
+    """
+    Returns: offset just past the last newline in [start, size), i.e. the
+    end of the last complete line (start if there is none)
+    """
+
+    block = 64 * 1024
+    position = size
+
+    with open(filename, "rb") as file:
+        while position > start:
+            read_from = max(start, position - block)
+            file.seek(read_from)
+            chunk = file.read(position - read_from)
+            newline = chunk.rfind(b"\n")
+            if newline != -1:
+                return read_from + newline + 1
+            position = read_from
+
+    return start
+
+def _header_end(filename):
+    with open(filename, "rb") as file:
+        file.readline()
+        return file.tell()
+
+def incremental_aggregate(filename, checkpoint_file=None, region=None,
+                          min_amount=None, max_amount=None, approx_error=None):
+    """
+    Aggregates the sales file, re-using the state persisted by the
+    previous run
+
+    The checkpoint stores the byte offset processed so far, a fingerprint
+    of the file up to that offset, the filter settings and the running
+    aggregates and filter counts. When the file has only grown since,
+    just the new tail is parsed, validated and merged in; otherwise (first
+    run, rewritten/truncated file, different filters) everything is
+    recomputed.
+
+    Only newline-terminated lines are committed to the checkpoint; an
+    unterminated last line is included in the returned result but
+    re-read on the next run, so the result always equals a full
+    recompute.
+
+    Returns: (aggregates, filter_summary, info) where info is
+    {'mode': 'full' | 'incremental', 'start_offset': int, 'end_offset': int}
+    """
+
+    checkpoint_file = checkpoint_file or default_checkpoint_file(filename)
+    size = os.path.getsize(filename)
+    filters = {
+        "region": region,
+        "min_amount": min_amount,
+        "max_amount": max_amount,
+        "approx_error": approx_error
+    }
+
+    checkpoint = load_checkpoint(checkpoint_file)
+    if checkpoint is not None:
+        offset = checkpoint.get("offset", 0)
+        if checkpoint.get("filters") != filters \
+                or offset > size \
+                or checkpoint.get("fingerprint") != file_fingerprint(filename, offset):
+            checkpoint = None
+
+    if checkpoint is not None:
+        try:
+            return _aggregate_from(
+                filename, checkpoint_file, filters, "incremental", checkpoint["encoding"],
+                checkpoint["offset"], size, aggregates_from_dict(checkpoint["aggregates"]),
+                checkpoint["filter_summary"]
+            )
+        except UnicodeDecodeError:
+            # A tail that does not decode with the checkpoint's encoding
+            # changes the encoding of the whole file: recompute
+            pass
+
+    for encoding in candidate_encodings(detect_encoding(filename)):
+        try:
+            return _aggregate_from(
+                filename, checkpoint_file, filters, "full", encoding,
+                _header_end(filename), size,
+                aggregate_transactions([], approx_error=approx_error),
+                {
+                    "total_input": 0,
+                    "invalid": 0,
+                    "filtered_by_region": 0,
+                    "filtered_by_amount": 0,
+                    "final_count": 0
+                }
+            )
+        except UnicodeDecodeError:
+            # Try next encoding
+            continue
+
+def _aggregate_from(filename, checkpoint_file, filters, mode, encoding, start, size,
+                    aggregates, filter_summary):
+    """
+    Merges bytes [start, size) into aggregates/filter_summary and saves
+    the checkpoint; raises UnicodeDecodeError if they do not decode with
+    encoding
+
+    Returns: (aggregates, filter_summary, info), see incremental_aggregate
+    """
+
+    def merge_range(range_start, range_end):
+        if range_end <= range_start:
+            return
+        partial, summary, _ = process_chunk(
+            filename, range_start, range_end, encoding, filters["region"],
+            filters["min_amount"], filters["max_amount"], filters["approx_error"]
+        )
+        merge_aggregates(aggregates, partial)
+        for key in filter_summary:
+            filter_summary[key] += summary.get(key, 0)
+
+    # ---------- New complete lines: merge and persist ----------
+    committed = _committed_end(filename, start, size)
+    merge_range(start, committed)
+
+    save_checkpoint(checkpoint_file, {
+        "version": CHECKPOINT_VERSION,
+        "source": os.path.abspath(filename),
+        "offset": committed,
+        "fingerprint": file_fingerprint(filename, committed),
+        "encoding": encoding,
+        "filters": filters,
+        "aggregates": aggregates_to_dict(aggregates),
+        "filter_summary": filter_summary
+    })
+
+    # ---------- Unterminated last line: this run only ----------
+    merge_range(committed, size)
+
+    info = {"mode": mode, "start_offset": start, "end_offset": size}
+    return aggregates, filter_summary, info
+
+def incremental_analyze(filename, checkpoint_file=None, region=None,
+                        min_amount=None, max_amount=None, n=5, threshold=10,
+                        approx_error=None):
+    """
+    incremental_aggregate followed by analyze_aggregates
+
+    Returns: (analytics, filter_summary, info)
+    """
+
+    aggregates, filter_summary, info = incremental_aggregate(
+        filename, checkpoint_file, region, min_amount, max_amount, approx_error
+    )
+    return analyze_aggregates(aggregates, n, threshold), filter_summary, info
@@ -0,0 +1,319 @@
+"""
+Opt-in instrumentation for the pipeline functions
+
+The stage-level functions of file_handler, data_processor, api_handler
+and sales_report are wrapped with @instrumented. While instrumentation
+is disabled (the default) the wrapper only checks a flag and calls the
+function. After enable() every call records, per function:
+- calls, wall time (total and self, i.e. excluding instrumented callees)
+- rows processed and rows rejected per reason
+- with trace_allocations, net and peak bytes allocated (tracemalloc;
+  the per-call peak needs tracemalloc.reset_peak, Python 3.9+, and is
+  left out on 3.8)
+
+Calls are also accumulated per call stack, which write_collapsed_stacks
+writes in the collapsed format read by flamegraph.pl and speedscope.
+profile() runs cProfile and dumps a .prof file for pstats / snakeviz.
+
+Usage:
+    with instrument_run(stats_file="stats.json", profile_file="run.prof"):
+        main()
+
+Only the calling process is measured: process-pool workers (see
+utils/parallel.py) are not instrumented.
+"""
+
+import cProfile
+import json
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from functools import wraps
+
+# Python 3.9+; without it the traced peak cannot be scoped to one call
+_can_reset_peak = hasattr(tracemalloc, "reset_peak")
+
+_enabled = False
+_trace_allocations = False
+_lock = threading.Lock()
+_local = threading.local()
+
+# name -> {'calls', 'seconds', 'self_seconds', 'rows', 'rejects', 'alloc_bytes', 'peak_alloc_bytes'}
+_stats = {}
+# 'outer;inner' -> self seconds
+_stacks = {}
+
+def enable(trace_allocations=False):
+    """
+    Starts recording instrumented calls; trace_allocations also starts
+    tracemalloc (which slows every allocation down noticeably)
+    """
+
+    global _enabled, _trace_allocations
+
+    _trace_allocations = trace_allocations
+    if trace_allocations and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    _enabled = True
+
+def disable():
+    """
+    Stops recording (collected stats are kept until reset)
+    """
+
+    global _enabled, _trace_allocations
+
+    _enabled = False
+    if _trace_allocations and tracemalloc.is_tracing():
+        tracemalloc.stop()
+    _trace_allocations = False
+
+def is_enabled():
+    return _enabled
+
+def reset():
+    with _lock:
+        _stats.clear()
+        _stacks.clear()
+
+# ---------- Row counters for @instrumented ----------
+def rows_from_first_arg(args, kwargs, result):
+    """
+    Returns: len() of the first argument (the default rows counter)
+    """
+
+    return len(args[0])
+
+def rows_from_result(args, kwargs, result):
+    """
+    Returns: len() of the return value
+    """
+
+    return len(result)
+
+def instrumented(name=None, rows=rows_from_first_arg, rejects=None):
+    """
+    Decorator recording the calls of a function while instrumentation
+    is enabled
+
+    Parameters:
+    - name: stats key (default: module.function)
+    - rows: callable (args, kwargs, result) -> rows processed; None to skip
+    - rejects: callable (args, kwargs, result) -> {reason: rows rejected}
+
+    Counters that cannot be computed for a call (e.g. len() of an
+    iterator) are skipped for that call.
+    """
+
+    def decorator(func):
+        key = name or f"{func.__module__.rsplit('.', 1)[-1]}.{func.__name__}"
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+
+            with _record(key) as call:
+                result = func(*args, **kwargs)
+                call["rows"] = _safe_count(rows, args, kwargs, result)
+                call["rejects"] = _safe_count(rejects, args, kwargs, result)
+            return result
+
+        return wrapper
+
+    return decorator
+
+def _safe_count(counter, args, kwargs, result):
+    if counter is None:
+        return None
+    try:
+        return counter(args, kwargs, result)
+    except Exception:
+        # Instrumentation must never break the instrumented call
+        return None
+
+@contextmanager
+def _record(name):
+    """
+    Times one call and adds it to the stats of name and of its call stack
+    """
+
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+
+    tracing = _trace_allocations and tracemalloc.is_tracing()
+    if tracing:
+        current, peak = tracemalloc.get_traced_memory()
+        if _can_reset_peak:
+            if stack:
+                # Keep the caller's peak before resetting it for this call
+                stack[-1]["peak"] = max(stack[-1]["peak"], peak)
+            tracemalloc.reset_peak()
+    else:
+        current = 0
+
+    call = {"rows": None, "rejects": None}
+    frame = {
+        "path": f"{stack[-1]['path']};{name}" if stack else name,
+        "children": 0.0,
+        "start_bytes": current,
+        "peak": current
+    }
+    stack.append(frame)
+    start = time.perf_counter()
+
+    try:
+        yield call
+    finally:
+        seconds = time.perf_counter() - start
+        stack.pop()
+
+        alloc_bytes = peak_bytes = None
+        if tracing and tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            peak = max(peak, frame["peak"])
+            alloc_bytes = current - frame["start_bytes"]
+            if _can_reset_peak:
+                peak_bytes = peak - frame["start_bytes"]
+                if stack:
+                    stack[-1]["peak"] = max(stack[-1]["peak"], peak)
+
+        if stack:
+            stack[-1]["children"] += seconds
+        self_seconds = seconds - frame["children"]
+
+        with _lock:
+            stats = _stats.get(name)
+            if stats is None:
+                stats = _stats[name] = {
+                    "calls": 0, "seconds": 0.0, "self_seconds": 0.0, "rows": 0,
+                    "rejects": {}, "alloc_bytes": None, "peak_alloc_bytes": None
+                }
+            stats["calls"] += 1
+            stats["seconds"] += seconds
+            stats["self_seconds"] += self_seconds
+            if call["rows"] is not None:
+                stats["rows"] += call["rows"]
+            for reason, count in (call["rejects"] or {}).items():
+                stats["rejects"][reason] = stats["rejects"].get(reason, 0) + count
+            if alloc_bytes is not None:
+                stats["alloc_bytes"] = (stats["alloc_bytes"] or 0) + alloc_bytes
+            if peak_bytes is not None:
+                stats["peak_alloc_bytes"] = max(stats["peak_alloc_bytes"] or 0, peak_bytes)
+
+            _stacks[frame["path"]] = _stacks.get(frame["path"], 0.0) + self_seconds
+
+# ---------- Results ----------
+def get_stats():
+    """
+    Returns: dictionary {name: {'calls', 'seconds', 'self_seconds',
+    'rows', 'rows_per_sec', 'rejects', 'alloc_bytes', 'peak_alloc_bytes'}}
+    ordered by total seconds, slowest first
+    """
+
+    with _lock:
+        items = [(name, dict(stats, rejects=dict(stats["rejects"]))) for name, stats in _stats.items()]
+
+    items.sort(key=lambda item: item[1]["seconds"], reverse=True)
+    for _, stats in items:
+        seconds = stats["seconds"]
+        stats["rows_per_sec"] = stats["rows"] / seconds if stats["rows"] and seconds > 0 else None
+    return dict(items)
+
+def format_stats(stats=None):
+    """
+    Returns: the stats as a text table (one line per function)
+    """
+
+    stats = get_stats() if stats is None else stats
+
+    lines = [
+        f"{'Function':<40}{'Calls':>7}{'Total s':>10}{'Self s':>10}{'Rows':>12}{'Alloc MiB':>11}  Rejects",
+        "-" * 100
+    ]
+    for name, s in stats.items():
+        alloc = f"{s['alloc_bytes'] / (1024 * 1024):.1f}" if s["alloc_bytes"] is not None else "-"
+        rejects = ", ".join(f"{reason}={count:,}" for reason, count in s["rejects"].items() if count)
+        lines.append(
+            f"{name:<40}{s['calls']:>7}{s['seconds']:>10.4f}{s['self_seconds']:>10.4f}"
+            f"{s['rows']:>12,}{alloc:>11}  {rejects}"
+        )
+    return "\n".join(lines)
+
+def write_stats(path):
+    """
+    Writes get_stats() as JSON to path ('-' for stdout)
+    """
+
+    text = json.dumps(get_stats(), indent=2)
+    if path == "-":
+        print(text)
+        return
+
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text + "\n")
+
+def write_collapsed_stacks(path):
+    """
+    Writes self time per instrumented call stack as collapsed stacks
+    ('outer;inner <microseconds>' per line), the input format of
+    flamegraph.pl and speedscope
+    """
+
+    with _lock:
+        stacks = sorted(_stacks.items())
+
+    with open(path, "w", encoding="utf-8") as f:
+        for path_key, seconds in stacks:
+            f.write(f"{path_key} {max(1, round(seconds * 1_000_000))}\n")
+
+@contextmanager
+def profile(profile_file):
+    """
+    Runs the enclosed block under cProfile and dumps the stats to
+    profile_file (load with pstats, snakeviz, or flameprof for a flame
+    graph); only the current thread is profiled
+
+    Yields: the cProfile.Profile object
+    """
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        profiler.dump_stats(profile_file)
+
+@contextmanager
+def instrument_run(stats_file=None, stacks_file=None, profile_file=None,
+                   trace_allocations=False, show=False):
+    """
+    Enables instrumentation (and optionally cProfile) for the enclosed
+    block, then writes the requested outputs
+
+    Parameters:
+    - stats_file: JSON stats path ('-' for stdout), see get_stats
+    - stacks_file: collapsed-stack path, see write_collapsed_stacks
+    - profile_file: cProfile output path, see profile
+    - show: print the stats table when the block ends
+    """
+
+    reset()
+    enable(trace_allocations)
+    try:
+        if profile_file:
+            with profile(profile_file):
+                yield
+        else:
+            yield
+    finally:
+        disable()
+        if show:
+            print(format_stats())
+        if stats_file:
+            write_stats(stats_file)
+        if stacks_file:
+            write_collapsed_stacks(stacks_file)
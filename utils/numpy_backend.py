@@ -0,0 +1,245 @@
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; the pure-Python backend is the default
+    np = None
+
+from utils.transaction_table import TransactionTable, CATEGORICAL_COLUMNS
+from utils.hyperloglog import distinct_counter_factory
+
+def numpy_available():
+    """
+    Returns: True if NumPy can be imported
+    """
+
+    return np is not None
+
+def amount_ranges_numpy(table):
+    """
+    Min and max of Quantity * UnitPrice straight from the column buffers
+    of a TransactionTable (a float64 temporary and a mask, no Python
+    objects per row); NaN amounts are ignored
+
+    Returns: (raw_range, positive_range), each (min, max) or None;
+    positive_range only covers rows with Quantity > 0 and UnitPrice > 0
+    """
+
+    if np is None:
+        raise ImportError("NumPy backend requested but numpy is not installed")
+
+    if not len(table.quantities):
+        return None, None
+
+    quantities = np.frombuffer(table.quantities, dtype=np.int64)
+    unit_prices = np.frombuffer(table.unit_prices, dtype=np.float64)
+    with np.errstate(invalid="ignore", over="ignore"):
+        # 0 * inf and the like give NaN, as in Python
+        amounts = quantities * unit_prices
+
+    def value_range(where):
+        # fmin/fmax skip NaN; where= avoids copying the selected amounts
+        if not where.any():
+            return None
+        low = np.fmin.reduce(amounts, where=where, initial=np.inf)
+        high = np.fmax.reduce(amounts, where=where, initial=-np.inf)
+        if low > high:
+            # Every selected amount is NaN
+            return None
+        return float(low), float(high)
+
+    return (
+        value_range(np.ones(len(amounts), dtype=bool)),
+        value_range((quantities > 0) & (unit_prices > 0))
+    )
+
+def _to_table(transactions):
+    """
+    Converts transaction dictionaries to a TransactionTable
+
+    Missing fields become "" / 0 like the .get() defaults of the Python
+    backend; rows whose numbers cannot be stored are dropped, as the
+    Python backend would skip them anyway.
+
+    Returns: TransactionTable
+    """
+
+    if isinstance(transactions, TransactionTable):
+        return transactions
+
+    table = TransactionTable()
+    for t in transactions:
+        try:
+            record = {column: t.get(column) or "" for column in CATEGORICAL_COLUMNS}
+            record["TransactionID"] = t.get("TransactionID") or ""
+            record["Quantity"] = t.get("Quantity", 0)
+            record["UnitPrice"] = t.get("UnitPrice", 0.0)
+            table.append(record)
+        except (AttributeError, TypeError, OverflowError):
+            continue
+
+    return table
+
+def _sequential_sum(weights, codes=None, minlength=1):
+    """
+    Per-group sums via bincount, which adds left to right exactly like the
+    Python loop does (np.sum uses pairwise summation and can differ in the
+    last bits)
+
+    Returns: float64 array of length >= minlength
+    """
+
+    if codes is None:
+        codes = np.zeros(len(weights), dtype=np.intp)
+    return np.bincount(codes, weights=weights, minlength=minlength)
+
+def _first_seen_order(codes, cardinality):
+    """
+    Returns: distinct codes ordered by first occurrence, matching the
+    insertion order of the Python backend's dictionaries
+    """
+
+    # Lowest row index per code, without sorting the rows
+    first_index = np.full(cardinality, len(codes), dtype=np.intp)
+    np.minimum.at(first_index, codes, np.arange(len(codes), dtype=np.intp))
+
+    present = np.flatnonzero(first_index < len(codes))
+    return present[np.argsort(first_index[present], kind="stable")].tolist()
+
+# Largest (left x right) key space deduplicated with a dense bitmap
+# instead of np.unique
+_PAIR_BITMAP_LIMIT = 1 << 24
+
+def _distinct_pairs(left, left_cardinality, right, right_cardinality):
+    """
+    Factorizes (left, right) code pairs into one int64 key and returns
+    the distinct pairs
+
+    Returns: iterator of (left_code, right_code) tuples
+    """
+
+    keys = left.astype(np.int64) * right_cardinality + right
+    key_space = left_cardinality * right_cardinality
+
+    if key_space <= _PAIR_BITMAP_LIMIT:
+        seen = np.zeros(key_space, dtype=bool)
+        seen[keys] = True
+        keys = np.flatnonzero(seen)
+    else:
+        keys = np.unique(keys)
+
+    return zip((keys // right_cardinality).tolist(), (keys % right_cardinality).tolist())
+
+def aggregate_numpy(transactions, approx_error=None):
+    """
+    NumPy implementation of aggregate_transactions
+
+    Group-bys run on the factorized category codes of a TransactionTable
+    with bincount/unique; only the final per-group results are turned
+    back into Python objects. A list of dictionaries is converted to a
+    table first. approx_error selects HyperLogLog sketches for the daily
+    distinct customers, as in aggregate_transactions.
+
+    Returns: dictionary of raw aggregates (see aggregate_transactions)
+    """
+
+    if np is None:
+        raise ImportError("NumPy backend requested but numpy is not installed")
+
+    table = _to_table(transactions)
+    values = table.values
+
+    quantities = np.frombuffer(table.quantities, dtype=np.int64)
+    unit_prices = np.frombuffer(table.unit_prices, dtype=np.float64)
+
+    def codes_of(column):
+        return np.frombuffer(table.codes[column], dtype=np.int32).astype(np.intp)
+
+    def truthy(column):
+        # Checked once per distinct value, then broadcast to the rows
+        value_ok = np.array([bool(v) for v in values[column]], dtype=bool)
+        return value_ok[codes_of(column)]
+
+    region_codes = codes_of("Region")
+    product_codes = codes_of("ProductName")
+    customer_codes = codes_of("CustomerID")
+    date_codes = codes_of("Date")
+
+    valid = (quantities > 0) & (unit_prices > 0)
+    amounts = quantities * unit_prices
+
+    region_names = values["Region"]
+    product_names = values["ProductName"]
+    customer_ids = values["CustomerID"]
+    dates = values["Date"]
+
+    # ---------- Total ----------
+    total_revenue = float(_sequential_sum(amounts[valid])[0])
+    transaction_count = int(np.count_nonzero(valid))
+
+    # ---------- Region ----------
+    sel = valid & truthy("Region")
+    codes = region_codes[sel]
+    region_total = float(_sequential_sum(amounts[sel])[0])
+    sales = _sequential_sum(amounts[sel], codes, len(region_names))
+    counts = np.bincount(codes, minlength=len(region_names))
+    regions = {
+        region_names[c]: [float(sales[c]), int(counts[c])]
+        for c in _first_seen_order(codes, len(region_names))
+    }
+
+    # ---------- Product ----------
+    sel = valid & truthy("ProductName")
+    codes = product_codes[sel]
+    revenue = _sequential_sum(amounts[sel], codes, len(product_names))
+    quantity = np.zeros(len(product_names), dtype=np.int64)
+    np.add.at(quantity, codes, quantities[sel])
+    products = {
+        product_names[c]: [int(quantity[c]), float(revenue[c])]
+        for c in _first_seen_order(codes, len(product_names))
+    }
+
+    # ---------- Customer ----------
+    sel = valid & truthy("CustomerID")
+    codes = customer_codes[sel]
+    spent = _sequential_sum(amounts[sel], codes, len(customer_ids))
+    counts = np.bincount(codes, minlength=len(customer_ids))
+    customers = {
+        customer_ids[c]: [float(spent[c]), int(counts[c]), set()]
+        for c in _first_seen_order(codes, len(customer_ids))
+    }
+    pairs = _distinct_pairs(codes, len(customer_ids), product_codes[sel], len(product_names))
+    for c, p in pairs:
+        customers[customer_ids[c]][2].add(product_names[p])
+
+    # ---------- Date ----------
+    date_valid = valid & truthy("Date")
+    codes = date_codes[date_valid]
+    revenue = _sequential_sum(amounts[date_valid], codes, len(dates))
+    counts = np.bincount(codes, minlength=len(dates))
+    daily_totals = {
+        dates[c]: [float(revenue[c]), int(counts[c])]
+        for c in _first_seen_order(codes, len(dates))
+    }
+
+    sel = date_valid & truthy("CustomerID")
+    codes = date_codes[sel]
+    revenue = _sequential_sum(amounts[sel], codes, len(dates))
+    counts = np.bincount(codes, minlength=len(dates))
+    new_day_customers = distinct_counter_factory(approx_error)
+    daily = {
+        dates[c]: [float(revenue[c]), int(counts[c]), new_day_customers()]
+        for c in _first_seen_order(codes, len(dates))
+    }
+    pairs = _distinct_pairs(codes, len(dates), customer_codes[sel], len(customer_ids))
+    for d, c in pairs:
+        daily[dates[d]][2].add(customer_ids[c])
+
+    return {
+        "total_revenue": total_revenue,
+        "transaction_count": transaction_count,
+        "region_total": region_total,
+        "regions": regions,
+        "products": products,
+        "customers": customers,
+        "daily": daily,
+        "daily_totals": daily_totals
+    }
@@ -0,0 +1,214 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from utils.file_handler import detect_encoding, candidate_encodings, iter_filtered_transactions
+from utils.data_processor import aggregate_transactions, merge_aggregates, analyze_aggregates
+
+def split_file_ranges(filename, chunks):
+    """
+    Splits the sales file into byte ranges that start and end on line
+    boundaries, skipping the header line
+
+    Returns: list of (start, end) byte offsets
+    """
+
+    size = os.path.getsize(filename)
+
+    with open(filename, "rb") as file:
+        file.readline()  # header
+        data_start = file.tell()
+
+        chunk_size = max((size - data_start) // max(chunks, 1), 1)
+        boundaries = [data_start]
+
+        for i in range(1, chunks):
+            target = data_start + i * chunk_size
+            if target <= boundaries[-1]:
+                continue
+            file.seek(target)
+            file.readline()  # move to the start of the next full line
+            position = file.tell()
+            if position >= size:
+                break
+            if position > boundaries[-1]:
+                boundaries.append(position)
+
+    boundaries.append(size)
+
+    return [
+        (start, end)
+        for start, end in zip(boundaries, boundaries[1:])
+        if end > start
+    ]
+
+def iter_range_lines(filename, start, end, encoding):
+    """
+    Streams cleaned lines from one byte range of the sales file
+
+    Decodes strictly: a UnicodeDecodeError propagates so the caller can
+    restart the whole file with the next encoding (see run_chunks), and
+    every range decodes exactly like read_sales_data.
+
+    Yields: raw line strings
+    """
+
+    with open(filename, "rb") as file:
+        file.seek(start)
+        position = start
+
+        while position < end:
+            raw = file.readline()
+            if not raw:
+                break
+            position += len(raw)
+
+            line = raw.decode(encoding).strip()
+            if line:
+                yield line
+
+def iter_kept(transactions, kept):
+    """
+    Passes transactions through, appending each one to the kept list
+
+    Yields: the same transaction dictionaries
+    """
+
+    keep = kept.append
+    for transaction in transactions:
+        keep(transaction)
+        yield transaction
+
+def process_chunk(filename, start, end, encoding, region=None,
+                  min_amount=None, max_amount=None, approx_error=None,
+                  keep_rows=False):
+    """
+    Worker task: parses, validates and aggregates one byte range
+
+    Parameters:
+    - keep_rows: also return the valid (filtered) transactions of the range
+
+    Returns: (aggregates, filter_summary, rows) where rows is the list of
+    valid transaction dictionaries, or None without keep_rows
+    """
+
+    filter_summary = {}
+    transactions = iter_filtered_transactions(
+        iter_range_lines(filename, start, end, encoding),
+        region=region,
+        min_amount=min_amount,
+        max_amount=max_amount,
+        filter_summary=filter_summary
+    )
+    rows = None
+    if keep_rows:
+        rows = []
+        transactions = iter_kept(transactions, rows)
+    aggregates = aggregate_transactions(transactions, approx_error=approx_error)
+
+    return aggregates, filter_summary, rows
+
+def parallel_aggregate(filename, workers=None, region=None, min_amount=None,
+                       max_amount=None, approx_error=None):
+    """
+    Parses, validates and aggregates the sales file on a process pool
+
+    The file is split into one line-aligned byte range per worker; each
+    worker streams its range through iter_filtered_transactions and
+    aggregate_transactions, and the partial
+    aggregates and filter counts are merged here in file order.
+
+    Parameters:
+    - workers: number of worker processes (default: os.cpu_count());
+      1 runs everything in the current process
+    - approx_error: use HyperLogLog sketches for daily distinct customers
+      (see aggregate_transactions); sketches merge across workers
+
+    Returns: (aggregates, filter_summary)
+    """
+
+    aggregates, filter_summary, _ = run_chunks(
+        filename, workers, region, min_amount, max_amount, approx_error
+    )
+    return aggregates, filter_summary
+
+def parallel_load(filename, workers=None, region=None, min_amount=None,
+                  max_amount=None, approx_error=None):
+    """
+    parallel_aggregate that also sends the valid transactions back from
+    the workers, so the caller needs no parse or validate pass of its own
+
+    Returns: (aggregates, filter_summary, valid_transactions) where
+    valid_transactions is in file order, like validate_and_filter's list
+    """
+
+    return run_chunks(
+        filename, workers, region, min_amount, max_amount, approx_error, keep_rows=True
+    )
+
+def run_chunks(filename, workers=None, region=None, min_amount=None,
+               max_amount=None, approx_error=None, keep_rows=False):
+    """
+    Runs process_chunk over one byte range per worker and merges the
+    results in file order
+
+    The detected encoding is tried first; if any range fails to decode,
+    every range is re-run with the next candidate, as read_sales_data
+    restarts, so the whole file is decoded with one encoding.
+
+    Returns: (aggregates, filter_summary, rows) with rows None unless keep_rows
+    """
+
+    workers = workers or os.cpu_count() or 1
+    ranges = split_file_ranges(filename, workers)
+
+    for encoding in candidate_encodings(detect_encoding(filename)):
+        tasks = [
+            (filename, start, end, encoding, region, min_amount, max_amount, approx_error, keep_rows)
+            for start, end in ranges
+        ]
+        try:
+            if workers == 1 or len(tasks) <= 1:
+                results = [process_chunk(*task) for task in tasks]
+            else:
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    futures = [executor.submit(process_chunk, *task) for task in tasks]
+                    results = [future.result() for future in futures]
+            break
+        except UnicodeDecodeError:
+            # Try next encoding
+            continue
+
+    # ---------- Merge partial results in file order ----------
+    aggregates = aggregate_transactions([], approx_error=approx_error)
+    filter_summary = {
+        "total_input": 0,
+        "invalid": 0,
+        "filtered_by_region": 0,
+        "filtered_by_amount": 0,
+        "final_count": 0
+    }
+
+    rows = [] if keep_rows else None
+
+    for partial, summary, chunk_rows in results:
+        merge_aggregates(aggregates, partial)
+        for key in filter_summary:
+            filter_summary[key] += summary.get(key, 0)
+        if keep_rows:
+            rows.extend(chunk_rows)
+
+    return aggregates, filter_summary, rows
+
+def parallel_analyze(filename, workers=None, region=None, min_amount=None,
+                     max_amount=None, n=5, threshold=10, approx_error=None):
+    """
+    Process-pool equivalent of parse -> validate_and_filter -> analyze_sales
+
+    Returns: (analytics, filter_summary) where analytics has the same keys
+    as analyze_sales
+    """
+
+    aggregates, filter_summary = parallel_aggregate(
+        filename, workers, region, min_amount, max_amount, approx_error
+    )
+    return analyze_aggregates(aggregates, n, threshold), filter_summary
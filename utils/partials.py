@@ -0,0 +1,250 @@
+"""
+Mergeable partial aggregates for combining sales files across processes
+or machines
+
+A partial is a plain dictionary:
+{
+    'sources': [absolute paths of the sales files it covers],
+    'approx_error': None (exact daily customer sets) or the HyperLogLog
+                    error the daily customers were sketched with,
+    'filter_summary': {same counts as validate_and_filter},
+    'aggregates': raw aggregates (see data_processor.aggregate_transactions)
+}
+
+Each store/day file can be aggregated on its own (build_partial), saved
+as JSON (save_partial), shipped anywhere and combined later
+(merge_partials / combine_partial_files). Merging only adds sums and
+counts and unions the distinct-customer sets, so combining is
+O(groups) regardless of how many rows the files held.
+
+Command line:
+    python -m utils.partials aggregate data/store1.txt -o store1.json
+    python -m utils.partials combine store1.json store2.json -o all.json
+"""
+
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from utils.data_processor import (
+    aggregate_transactions,
+    merge_aggregates,
+    aggregates_to_dict,
+    aggregates_from_dict,
+    analyze_aggregates
+)
+from utils.hyperloglog import HyperLogLog
+from utils.parallel import parallel_aggregate
+
+PARTIAL_FORMAT = "sales-partial-aggregates"
+PARTIAL_VERSION = 2  # 2: records approx_error
+
+def empty_partial(approx_error=None):
+    """
+    Returns: partial covering no files (identity for merge_partials)
+    """
+
+    return {
+        "sources": [],
+        "approx_error": approx_error,
+        "filter_summary": {
+            "total_input": 0,
+            "invalid": 0,
+            "filtered_by_region": 0,
+            "filtered_by_amount": 0,
+            "final_count": 0
+        },
+        "aggregates": aggregate_transactions([], approx_error=approx_error)
+    }
+
+def counting_mode(approx_error):
+    """
+    Returns: None for exact daily customer sets, else the HyperLogLog
+    precision approx_error maps to (partials merge only within one mode)
+    """
+
+    if approx_error is None:
+        return None
+    return HyperLogLog.from_error(approx_error).precision
+
+def describe_counting(approx_error):
+    if approx_error is None:
+        return "exact daily customers"
+    return f"approx_error={approx_error} (HyperLogLog precision {counting_mode(approx_error)})"
+
+def build_partial(filename, region=None, min_amount=None, max_amount=None, workers=1,
+                  approx_error=None):
+    """
+    Parses, validates and aggregates one sales file
+
+    With approx_error the daily distinct customers are HyperLogLog
+    sketches; partials must all use the same mode and error to be merged.
+
+    Returns: partial dictionary
+    """
+
+    aggregates, filter_summary = parallel_aggregate(
+        filename, workers, region, min_amount, max_amount, approx_error
+    )
+
+    return {
+        "sources": [os.path.abspath(filename)],
+        "approx_error": approx_error,
+        "filter_summary": filter_summary,
+        "aggregates": aggregates
+    }
+
+def merge_partials(partials):
+    """
+    Combines partials in the given order
+
+    Raises: ValueError if the partials count daily customers differently
+    (exact sets vs HyperLogLog, or sketches of different precision)
+
+    Returns: new partial dictionary
+    """
+
+    merged = None
+
+    for partial in partials:
+        if merged is None:
+            merged = empty_partial(partial["approx_error"])
+        elif counting_mode(partial["approx_error"]) != counting_mode(merged["approx_error"]):
+            raise ValueError(
+                f"Cannot merge partials with different daily customer counting: "
+                f"{describe_counting(merged['approx_error'])} ({', '.join(merged['sources'])}) vs "
+                f"{describe_counting(partial['approx_error'])} ({', '.join(partial['sources'])})"
+            )
+        merged["sources"].extend(partial["sources"])
+        for key in merged["filter_summary"]:
+            merged["filter_summary"][key] += partial["filter_summary"].get(key, 0)
+        merge_aggregates(merged["aggregates"], partial["aggregates"])
+
+    return merged if merged is not None else empty_partial()
+
+def save_partial(partial, path):
+    """
+    Writes a partial as JSON (atomically, via temp file + rename)
+    """
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    data = {
+        "format": PARTIAL_FORMAT,
+        "version": PARTIAL_VERSION,
+        "sources": partial["sources"],
+        "approx_error": partial["approx_error"],
+        "filter_summary": partial["filter_summary"],
+        "aggregates": aggregates_to_dict(partial["aggregates"])
+    }
+
+    temp_file = path + ".tmp"
+    with open(temp_file, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(temp_file, path)
+
+def load_partial(path):
+    """
+    Reads a partial written by save_partial
+
+    Raises: ValueError if the file is not a partial of a supported version
+    """
+
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+
+    if data.get("format") != PARTIAL_FORMAT or data.get("version") != PARTIAL_VERSION:
+        raise ValueError(f"'{path}' is not a version {PARTIAL_VERSION} partial aggregate file")
+
+    return {
+        "sources": data["sources"],
+        "approx_error": data["approx_error"],
+        "filter_summary": data["filter_summary"],
+        "aggregates": aggregates_from_dict(data["aggregates"])
+    }
+
+def aggregate_files(filenames, workers=None, region=None, min_amount=None, max_amount=None,
+                    approx_error=None):
+    """
+    Aggregates several sales files independently on a process pool (one
+    file per task) and merges the partials in the given order
+
+    Returns: partial dictionary
+    """
+
+    workers = workers or os.cpu_count() or 1
+    tasks = [
+        (filename, region, min_amount, max_amount, 1, approx_error)
+        for filename in filenames
+    ]
+
+    if workers == 1 or len(tasks) <= 1:
+        partials = [build_partial(*task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(build_partial, *task) for task in tasks]
+            partials = [future.result() for future in futures]
+
+    return merge_partials(partials)
+
+def combine_partial_files(paths):
+    """
+    Returns: merged partial of the given partial files
+    """
+
+    return merge_partials(load_partial(path) for path in paths)
+
+def print_partial_summary(partial):
+    analytics = analyze_aggregates(partial["aggregates"])
+    summary = partial["filter_summary"]
+
+    print(f"Sources: {len(partial['sources'])}")
+    print(f"Rows: {summary['total_input']} | Invalid: {summary['invalid']} | Kept: {summary['final_count']}")
+    print(f"Total Revenue: ₹{analytics['total_revenue']:,.2f}")
+    print(f"Regions: {len(analytics['region_stats'])} | Customers: {len(analytics['customer_stats'])} "
+          f"| Days: {len(analytics['daily_stats'])}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build and combine partial sales aggregates")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    aggregate = commands.add_parser("aggregate", help="aggregate sales files into one partial")
+    aggregate.add_argument("files", nargs="+")
+    aggregate.add_argument("-o", "--output", required=True)
+    aggregate.add_argument("--workers", type=int, default=None)
+    aggregate.add_argument("--region")
+    aggregate.add_argument("--min-amount", type=float)
+    aggregate.add_argument("--max-amount", type=float)
+    aggregate.add_argument("--approx-error", type=float,
+                           help="estimate daily unique customers with HyperLogLog (e.g. 0.01)")
+
+    combine = commands.add_parser("combine", help="merge partial files")
+    combine.add_argument("partials", nargs="+")
+    combine.add_argument("-o", "--output", required=True)
+
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == "aggregate":
+            partial = aggregate_files(
+                args.files, args.workers, args.region, args.min_amount, args.max_amount,
+                args.approx_error
+            )
+        else:
+            partial = combine_partial_files(args.partials)
+    except (OSError, ValueError) as e:
+        # Missing/unreadable inputs, non-partial files, mismatched partials
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    save_partial(partial, args.output)
+    print_partial_summary(partial)
+    print(f"Partial saved to: {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,107 @@
+import json
+import sys
+import time
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+def peak_rss_bytes(children=False):
+    """
+    Returns: peak resident set size of this process (or of its finished
+    child processes, e.g. pool workers) in bytes, or None if the platform
+    does not report it
+    """
+
+    if resource is None:
+        return None
+
+    who = resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF
+    peak = resource.getrusage(who).ru_maxrss
+
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return peak if sys.platform == "darwin" else peak * 1024
+
+class PipelineTimer:
+    """
+    Records wall time and row counts per pipeline stage
+
+    Usage:
+        timer = PipelineTimer()
+        with timer.stage("parse") as stage:
+            transactions = parse_transactions(raw_lines)
+            stage["rows"] = len(transactions)
+        print(timer.summary())
+    """
+
+    def __init__(self):
+        self.stages = []
+        self.started = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name):
+        """
+        Times the enclosed block as one stage; the yielded dict can be
+        given a 'rows' count (rows handled by the stage)
+        """
+
+        record = {"name": name, "seconds": 0.0, "rows": None}
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record["seconds"] = time.perf_counter() - start
+            self.stages.append(record)
+
+    def last_stage_text(self):
+        """
+        Returns: '(0.123s, 45,678 rows/s)' for the most recent stage
+        """
+
+        record = self._with_rate(self.stages[-1])
+        if record["rows_per_sec"] is None:
+            return f"({record['seconds']:.3f}s)"
+        return f"({record['seconds']:.3f}s, {record['rows_per_sec']:,.0f} rows/s)"
+
+    def summary(self, **extra):
+        """
+        Returns: JSON-serializable dictionary:
+        {
+            'stages': [{'name', 'seconds', 'rows', 'rows_per_sec'}, ...],
+            'total_seconds': float,
+            'peak_rss_bytes': int or None,
+            'peak_rss_children_bytes': int or None,
+            ...extra
+        }
+        """
+
+        summary = {
+            "stages": [self._with_rate(record) for record in self.stages],
+            "total_seconds": time.perf_counter() - self.started,
+            "peak_rss_bytes": peak_rss_bytes(),
+            "peak_rss_children_bytes": peak_rss_bytes(children=True)
+        }
+        summary.update(extra)
+        return summary
+
+    def write_summary(self, path, **extra):
+        """
+        Writes summary() as JSON to path ('-' for stdout)
+        """
+
+        text = json.dumps(self.summary(**extra), indent=2)
+        if path == "-":
+            print(text)
+            return
+
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+
+    @staticmethod
+    def _with_rate(record):
+        rows = record["rows"]
+        seconds = record["seconds"]
+        rate = rows / seconds if rows is not None and seconds > 0 else None
+        return dict(record, rows_per_sec=rate)
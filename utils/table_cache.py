@@ -0,0 +1,224 @@
+"""
+Binary cache of the parsed sales file
+
+The first load parses the text file into a TransactionTable and writes
+it next to the source (data/sales_data.txt -> data/sales_data.txt.tblcache).
+Later loads memory-map the cache and copy each column straight into its
+array, so there is no decoding, splitting or number conversion per row.
+
+File layout:
+    8 bytes   magic b"SALESTBL"
+    8 bytes   header length (little-endian unsigned)
+    header    UTF-8 JSON: version, source signature, row/line counts,
+              encoding, category dictionaries and the section table
+    sections  raw column bytes, each aligned to 8 bytes:
+              quantities (q), unit_prices (d), one code array (i) per
+              categorical column, and the TransactionIDs as one
+              newline-joined UTF-8 block
+
+The cache is only used while the source file's size, modification time
+and sampled content hash match the values recorded in the header, and
+while the machine's byte order and array item sizes match the writer's.
+"""
+
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+from utils.file_handler import read_sales_data, parse_transactions
+from utils.incremental import file_fingerprint
+from utils.transaction_table import TransactionTable, CATEGORICAL_COLUMNS
+
+CACHE_MAGIC = b"SALESTBL"
+CACHE_VERSION = 1
+CACHE_SUFFIX = ".tblcache"
+
+_HEADER_LENGTH = struct.Struct("<Q")
+_ALIGNMENT = 8
+
+def default_cache_file(filename):
+    return filename + CACHE_SUFFIX
+
+def source_signature(filename):
+    """
+    Returns: {'size': int, 'mtime_ns': int, 'fingerprint': str} for the
+    source file (fingerprint hashes its first and last 64 KiB)
+    """
+
+    stat = os.stat(filename)
+    return {
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "fingerprint": file_fingerprint(filename, stat.st_size)
+    }
+
+def _machine_layout():
+    return {
+        "byteorder": sys.byteorder,
+        "itemsizes": {code: array(code).itemsize for code in "qdi"}
+    }
+
+def save_table_cache(table, cache_file, signature, line_count, encoding=None):
+    """
+    Writes a TransactionTable to cache_file (atomically, via temp file +
+    rename)
+    """
+
+    transaction_ids = "\n".join(table.transaction_ids).encode("utf-8")
+
+    sections = [
+        ("Quantity", table.quantities),
+        ("UnitPrice", table.unit_prices)
+    ]
+    sections += [(column, table.codes[column]) for column in CATEGORICAL_COLUMNS]
+    sections.append(("TransactionID", transaction_ids))
+
+    # ---------- Section table (offsets relative to the data start) ----------
+    section_table = {}
+    offset = 0
+    for name, data in sections:
+        length = len(memoryview(data).cast("B"))
+        section_table[name] = [offset, length]
+        offset += length + (-length % _ALIGNMENT)
+
+    header = json.dumps({
+        "version": CACHE_VERSION,
+        "source": signature,
+        "rows": len(table),
+        "line_count": line_count,
+        "encoding": encoding,
+        "layout": _machine_layout(),
+        "values": table.values,
+        "sections": section_table
+    }).encode("utf-8")
+    header += b" " * (-(len(CACHE_MAGIC) + _HEADER_LENGTH.size + len(header)) % _ALIGNMENT)
+
+    temp_file = cache_file + ".tmp"
+    with open(temp_file, "wb") as f:
+        f.write(CACHE_MAGIC)
+        f.write(_HEADER_LENGTH.pack(len(header)))
+        f.write(header)
+        for name, data in sections:
+            length = section_table[name][1]
+            f.write(data)
+            f.write(b"\0" * (-length % _ALIGNMENT))
+    os.replace(temp_file, cache_file)
+
+def load_table_cache(cache_file, signature=None):
+    """
+    Loads a TransactionTable from cache_file
+
+    Parameters:
+    - signature: expected source_signature; the cache is rejected if it
+      was written for a different version of the source file
+
+    Returns: (table, header) or None if the cache is missing, stale or
+    unreadable
+    """
+
+    try:
+        with open(cache_file, "rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return _read_cache(mm, signature)
+    except (OSError, ValueError, KeyError, TypeError, struct.error):
+        return None
+
+def _read_cache(mm, signature):
+    prefix = len(CACHE_MAGIC) + _HEADER_LENGTH.size
+    if mm[:len(CACHE_MAGIC)] != CACHE_MAGIC:
+        return None
+
+    (header_length,) = _HEADER_LENGTH.unpack(mm[len(CACHE_MAGIC):prefix])
+    header = json.loads(mm[prefix:prefix + header_length].decode("utf-8"))
+
+    if header.get("version") != CACHE_VERSION or header.get("layout") != _machine_layout():
+        return None
+    if signature is not None and header.get("source") != signature:
+        return None
+
+    data_start = prefix + header_length
+    sections = header["sections"]
+    view = memoryview(mm)
+
+    def section(name):
+        offset, length = sections[name]
+        start = data_start + offset
+        return view[start:start + length]
+
+    try:
+        table = TransactionTable()
+
+        # One bulk copy per column; no per-row work
+        table.quantities.frombytes(section("Quantity"))
+        table.unit_prices.frombytes(section("UnitPrice"))
+        for column in CATEGORICAL_COLUMNS:
+            table.codes[column].frombytes(section(column))
+            table.values[column] = header["values"][column]
+            table._lookup[column] = {
+                value: code for code, value in enumerate(table.values[column])
+            }
+
+        rows = header["rows"]
+        table.transaction_ids = str(section("TransactionID"), "utf-8").split("\n") if rows else []
+    finally:
+        view.release()
+
+    columns = [table.quantities, table.unit_prices, table.transaction_ids]
+    columns += [table.codes[column] for column in CATEGORICAL_COLUMNS]
+    if any(len(column) != rows for column in columns):
+        return None
+
+    return table, header
+
+def load_sales_table(filename, cache_file=None, read_info=None, use_cache=True):
+    """
+    Returns the parsed sales file as a TransactionTable, from the binary
+    cache when it is still valid, otherwise by parsing the text file
+    (read_sales_data + parse_transactions(columnar=True)) and refreshing
+    the cache
+
+    Parameters:
+    - cache_file: cache path (default: the source path + '.tblcache')
+    - read_info: optional dict, updated with
+      {'encoding': str, 'line_count': int, 'cache': 'hit' | 'miss' | 'disabled'}
+    - use_cache: False always parses and leaves the cache untouched
+
+    Returns: TransactionTable (empty if the file cannot be read)
+    """
+
+    cache_file = cache_file or default_cache_file(filename)
+    info = read_info if read_info is not None else {}
+
+    try:
+        signature = source_signature(filename)
+    except FileNotFoundError:
+        print(f"Error: File '{filename}' not found.")
+        return TransactionTable()
+
+    if use_cache:
+        cached = load_table_cache(cache_file, signature)
+        if cached is not None:
+            table, header = cached
+            info.update({
+                "encoding": header["encoding"],
+                "line_count": header["line_count"],
+                "cache": "hit"
+            })
+            return table
+
+    # ---------- Parse the text file ----------
+    raw_lines = read_sales_data(filename, read_info=info)
+    table = parse_transactions(raw_lines, columnar=True)
+    info["line_count"] = len(raw_lines)
+    info["cache"] = "miss" if use_cache else "disabled"
+
+    if use_cache:
+        try:
+            save_table_cache(table, cache_file, signature, len(raw_lines), info.get("encoding"))
+        except OSError as e:
+            print(f"Warning: could not write table cache '{cache_file}': {e}")
+
+    return table
@@ -0,0 +1,180 @@
+from bisect import bisect_left, bisect_right
+
+from utils.transaction_table import TransactionTable
+
+class TransactionIndex:
+    """
+    In-memory index over parsed transactions for repeated filtering
+
+    Built once (see file_handler.build_transaction_index) over a list of
+    transaction dictionaries or a TransactionTable, it keeps the valid
+    rows' positions in:
+    - per-Region, per-Date and per-CustomerID posting lists
+    - the amounts (Quantity * UnitPrice) sorted ascending, for range
+      queries with bisect
+
+    so a query costs time proportional to the rows it returns (plus
+    the smallest candidate list), not to the size of the data.
+    Positions are always returned in file order, so analytics over a
+    query result match those over the equivalent filtered list.
+    """
+
+    def __init__(self, transactions, valid_positions, total_input, input_info):
+        self.transactions = transactions
+        self.valid_positions = valid_positions
+        self.total_input = total_input
+        self.invalid_count = total_input - len(valid_positions)
+        self.input_info = input_info
+
+        regions = _column(transactions, "Region")
+        dates = _column(transactions, "Date")
+        customers = _column(transactions, "CustomerID")
+        quantities = _column(transactions, "Quantity")
+        unit_prices = _column(transactions, "UnitPrice")
+
+        # Per-position lookups used to check the remaining predicates
+        # of a query against its smallest candidate list
+        self._regions = regions
+        self._dates = dates
+        self._customers = customers
+        self._amounts = amounts = [None] * total_input
+
+        self.by_region = by_region = {}
+        self.by_date = by_date = {}
+        self.by_customer = by_customer = {}
+
+        for position in valid_positions:
+            region = regions[position]
+            if region in by_region:
+                by_region[region].append(position)
+            else:
+                by_region[region] = [position]
+
+            date = dates[position]
+            if date in by_date:
+                by_date[date].append(position)
+            else:
+                by_date[date] = [position]
+
+            customer = customers[position]
+            if customer in by_customer:
+                by_customer[customer].append(position)
+            else:
+                by_customer[customer] = [position]
+
+            amounts[position] = quantities[position] * unit_prices[position]
+
+        # NaN amounts cannot be ordered; they pass every amount filter
+        self._nan_amount_positions = [p for p in valid_positions if amounts[p] != amounts[p]]
+        ordered = [p for p in valid_positions if amounts[p] == amounts[p]]
+
+        self.amount_order = sorted(ordered, key=amounts.__getitem__)
+        self.sorted_amounts = [amounts[p] for p in self.amount_order]
+
+    def __len__(self):
+        return len(self.valid_positions)
+
+    def amount_positions(self, min_amount=None, max_amount=None):
+        """
+        Returns: positions with min_amount <= amount <= max_amount
+        (either bound optional), in amount order
+        """
+
+        low = 0 if min_amount is None else bisect_left(self.sorted_amounts, min_amount)
+        high = len(self.sorted_amounts) if max_amount is None \
+            else bisect_right(self.sorted_amounts, max_amount)
+
+        return self.amount_order[low:high] + self._nan_amount_positions
+
+    def positions(self, region=None, min_amount=None, max_amount=None,
+                  date=None, customer_id=None):
+        """
+        Returns: sorted positions of the valid rows matching every given
+        predicate (region/date/customer_id equality, amount bounds
+        inclusive)
+        """
+
+        candidates = []
+        if region:
+            candidates.append(("region", self.by_region.get(region, [])))
+        if date:
+            candidates.append(("date", self.by_date.get(date, [])))
+        if customer_id:
+            candidates.append(("customer_id", self.by_customer.get(customer_id, [])))
+
+        check_amount = min_amount is not None or max_amount is not None
+        if check_amount:
+            low = 0 if min_amount is None else bisect_left(self.sorted_amounts, min_amount)
+            high = len(self.sorted_amounts) if max_amount is None \
+                else bisect_right(self.sorted_amounts, max_amount)
+            # Only materialize the amount range if it is the smallest list
+            if not candidates or high - low < min(len(c) for _, c in candidates):
+                candidates.append(("amount", self.amount_positions(min_amount, max_amount)))
+
+        if not candidates:
+            return list(self.valid_positions)
+
+        # ---------- Smallest candidate list, checked against the rest ----------
+        driver, result = min(candidates, key=lambda candidate: len(candidate[1]))
+
+        if region and driver != "region":
+            result = [p for p in result if self._regions[p] == region]
+        if date and driver != "date":
+            result = [p for p in result if self._dates[p] == date]
+        if customer_id and driver != "customer_id":
+            result = [p for p in result if self._customers[p] == customer_id]
+        if check_amount and driver != "amount":
+            amounts = self._amounts
+            result = [
+                p for p in result
+                if not ((min_amount is not None and amounts[p] < min_amount)
+                        or (max_amount is not None and amounts[p] > max_amount))
+            ]
+
+        return sorted(result)
+
+    def rows(self, positions):
+        """
+        Returns: the rows at positions, as a list of transaction
+        dictionaries or a TransactionTable (matching the indexed data)
+        """
+
+        if isinstance(self.transactions, TransactionTable):
+            return self.transactions.take(positions)
+        return [self.transactions[p] for p in positions]
+
+    def query(self, region=None, min_amount=None, max_amount=None,
+              date=None, customer_id=None):
+        """
+        Returns: the valid rows matching every given predicate, in file
+        order (see positions)
+        """
+
+        return self.rows(self.positions(region, min_amount, max_amount, date, customer_id))
+
+    def count(self, region=None, min_amount=None, max_amount=None,
+              date=None, customer_id=None):
+        """
+        Returns: number of valid rows matching every given predicate
+        """
+
+        if min_amount is None and max_amount is None and not date and not customer_id:
+            if region:
+                return len(self.by_region.get(region, []))
+            return len(self.valid_positions)
+
+        return len(self.positions(region, min_amount, max_amount, date, customer_id))
+
+def _column(transactions, name):
+    """
+    Returns: list (or array) of one field's values for every row
+    """
+
+    if isinstance(transactions, TransactionTable):
+        if name == "Quantity":
+            return transactions.quantities
+        if name == "UnitPrice":
+            return transactions.unit_prices
+        return transactions.column(name)
+
+    return [t.get(name) for t in transactions]
@@ -0,0 +1,178 @@
+from array import array
+from operator import itemgetter
+
+# Field order of a parsed transaction row
+TRANSACTION_FIELDS = (
+    "TransactionID", "Date", "ProductID", "ProductName",
+    "Quantity", "UnitPrice", "CustomerID", "Region"
+)
+
+# Low-cardinality columns stored as integer codes into a value list
+CATEGORICAL_COLUMNS = ["Date", "ProductID", "ProductName", "CustomerID", "Region"]
+
+class TransactionTable:
+    """
+    Columnar, array-backed store for parsed transactions
+
+    Instead of one dictionary per row, each field is held in its own
+    column:
+    - TransactionID: list of strings
+    - Quantity: array('q') of ints
+    - UnitPrice: array('d') of floats
+    - Date, ProductID, ProductName, CustomerID, Region: dictionary-encoded,
+      i.e. array('i') of codes into a per-column list of distinct values
+
+    Iterating the table yields the usual transaction dictionaries, so code
+    that only reads rows keeps working unchanged.
+    """
+
+    def __init__(self):
+        self.transaction_ids = []
+        self.quantities = array("q")
+        self.unit_prices = array("d")
+        self.codes = {column: array("i") for column in CATEGORICAL_COLUMNS}
+        self.values = {column: [] for column in CATEGORICAL_COLUMNS}
+        self._lookup = {column: {} for column in CATEGORICAL_COLUMNS}
+
+    def __len__(self):
+        return len(self.transaction_ids)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.row(i)
+
+    def __getitem__(self, index):
+        return self.row(index)
+
+    def encode(self, column, value):
+        """
+        Returns the code for value in a categorical column, adding it
+        to the column's dictionary if it is new
+        """
+
+        lookup = self._lookup[column]
+        code = lookup.get(value)
+        if code is None:
+            code = len(lookup)
+            lookup[value] = code
+            self.values[column].append(value)
+        return code
+
+    def append(self, record):
+        """
+        Appends one transaction dictionary (as produced by parse_transactions)
+
+        Raises OverflowError if Quantity does not fit in a 64-bit integer.
+        """
+
+        # Numeric columns first so a failed append leaves the table untouched
+        self.quantities.append(record["Quantity"])
+        try:
+            self.unit_prices.append(record["UnitPrice"])
+        except (TypeError, OverflowError):
+            self.quantities.pop()
+            raise
+
+        self.transaction_ids.append(record["TransactionID"])
+        for column in CATEGORICAL_COLUMNS:
+            self.codes[column].append(self.encode(column, record[column]))
+
+    def extend_rows(self, rows):
+        """
+        Appends row tuples in TRANSACTION_FIELDS order (as produced by
+        iter_transaction_rows), one column at a time
+
+        Raises OverflowError (leaving the table untouched) if a Quantity
+        does not fit in a 64-bit integer.
+        """
+
+        if not rows:
+            return
+
+        # Build the numeric arrays first so a failure changes nothing
+        quantities = array("q", map(itemgetter(4), rows))
+        unit_prices = array("d", map(itemgetter(5), rows))
+
+        self.quantities.extend(quantities)
+        self.unit_prices.extend(unit_prices)
+        self.transaction_ids.extend(map(itemgetter(0), rows))
+
+        for column, position in zip(CATEGORICAL_COLUMNS, (1, 2, 3, 6, 7)):
+            column_values = list(map(itemgetter(position), rows))
+            lookup = self._lookup[column]
+            # New values get codes in first-seen order, as with encode()
+            for value in dict.fromkeys(column_values):
+                if value not in lookup:
+                    lookup[value] = len(lookup)
+                    self.values[column].append(value)
+            self.codes[column].extend(map(lookup.__getitem__, column_values))
+
+    def row(self, index):
+        """
+        Returns: transaction dictionary for the row at index
+        """
+
+        values = self.values
+        codes = self.codes
+
+        return {
+            "TransactionID": self.transaction_ids[index],
+            "Date": values["Date"][codes["Date"][index]],
+            "ProductID": values["ProductID"][codes["ProductID"][index]],
+            "ProductName": values["ProductName"][codes["ProductName"][index]],
+            "Quantity": self.quantities[index],
+            "UnitPrice": self.unit_prices[index],
+            "CustomerID": values["CustomerID"][codes["CustomerID"][index]],
+            "Region": values["Region"][codes["Region"][index]]
+        }
+
+    def column(self, name):
+        """
+        Returns: list of decoded values for one field
+        """
+
+        if name == "TransactionID":
+            return list(self.transaction_ids)
+        if name == "Quantity":
+            return list(self.quantities)
+        if name == "UnitPrice":
+            return list(self.unit_prices)
+
+        values = self.values[name]
+        return [values[code] for code in self.codes[name]]
+
+    def take(self, indices):
+        """
+        Builds a new table holding only the given rows (in the given order)
+
+        Category dictionaries are copied as-is, so codes stay comparable
+        between the original table and the subset.
+
+        Returns: TransactionTable
+        """
+
+        subset = TransactionTable()
+        subset.transaction_ids = [self.transaction_ids[i] for i in indices]
+        subset.quantities = array("q", [self.quantities[i] for i in indices])
+        subset.unit_prices = array("d", [self.unit_prices[i] for i in indices])
+
+        for column in CATEGORICAL_COLUMNS:
+            codes = self.codes[column]
+            subset.codes[column] = array("i", [codes[i] for i in indices])
+            subset.values[column] = list(self.values[column])
+            subset._lookup[column] = dict(self._lookup[column])
+
+        return subset
+
+    @classmethod
+    def from_records(cls, records):
+        """
+        Builds a table from an iterable of transaction dictionaries
+
+        Returns: TransactionTable
+        """
+
+        table = cls()
+        for record in records:
+            table.append(record)
+        return table